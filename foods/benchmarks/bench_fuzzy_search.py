@@ -0,0 +1,81 @@
+"""
+Measures the memory footprint, build time and query latency of the fuzzy search index
+(foodtracker/fuzzy.py) on a synthetic catalog of food names.
+
+Usage: python foods/benchmarks/bench_fuzzy_search.py [--names 1000000] [--words 100000]
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foods.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from foodtracker.fuzzy import FuzzyIndex  # noqa: E402
+
+FOODS = ['broccoli', 'greek yogurt', 'banana', 'chicken breast', 'oatmeal', 'baby spinach', 'cheddar cheese', 'almond milk']
+QUERIES = ['brocoli', 'yoghurt', 'bananna', 'chiken brest', 'otmeal', 'spinnach', 'chedar cheese', 'almnd milk']
+CONSONANTS = 'bcdfghklmnprstvz'
+VOWELS = 'aeiou'
+
+
+def synthetic_names(count, vocabulary_size, seed=1):
+    rng = random.Random(seed)
+    vocabulary = set()
+    while len(vocabulary) < vocabulary_size:
+        length = rng.randint(2, 5)
+        vocabulary.add(''.join(rng.choice(CONSONANTS) + rng.choice(VOWELS) for _ in range(length)))
+    vocabulary = sorted(vocabulary)
+    rng.shuffle(vocabulary)
+    # Food names reuse common words far more than rare ones
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    for food_id in range(1, count + 1):
+        name = rng.choices(vocabulary, cum_weights=cum_weights, k=rng.randint(2, 4))
+        if food_id % 1000 == 0:
+            name[0] = rng.choice(FOODS)
+        yield food_id, ' '.join(name) + f" {food_id % 500}g"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--names', type=int, default=1000000)
+    parser.add_argument('--words', type=int, default=100000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = FuzzyIndex(synthetic_names(args.names, args.words))
+    build_seconds = time.perf_counter() - start
+    del index
+
+    # Built again for the memory figures, tracing slows building down a lot
+    tracemalloc.start()
+    index = FuzzyIndex(synthetic_names(args.names, args.words))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{args.names} names, {len(index)} distinct words")
+    print(f"{'build':<24} {build_seconds:9.2f} s")
+    print(f"{'index size':<24} {current / 2**20:9.1f} MB ({current / args.names:.0f} bytes per name)")
+    print(f"{'peak while building':<24} {peak / 2**20:9.1f} MB")
+
+    for query in QUERIES:
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            ranked = index.search(query, settings.FUZZY_SEARCH_LIMIT, settings.FUZZY_SEARCH_MIN_SIMILARITY, settings.FUZZY_MAX_POSTINGS)
+            timings.append(time.perf_counter() - start)
+        corrected = [index.vocabulary[word_id] for _, word_id in index.corrections(query.split()[0], 0.5)[:1]]
+        print(f"{query!r:<24} {min(timings) * 1000:7.2f} ms  {len(ranked):3d} matches  {corrected}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmarks rendering a large FoodLogEntrySerializer payload with DRF's JSONRenderer vs FastJSONRenderer,
+and the cost/size of gzip vs brotli compression of the result.
+
+Usage: python foods/benchmarks/bench_json_rendering.py [--entries 5000] [--repeat 20]
+"""
+import argparse
+import decimal
+import gzip
+import os
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foods.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from foodtracker.models import FoodItem, FoodLogEntry  # noqa: E402
+from foodtracker.serializer import FoodLogEntrySerializer  # noqa: E402
+from foods.renderers import FastJSONRenderer, orjson  # noqa: E402
+from foods.middleware import brotli  # noqa: E402
+from users.models import User  # noqa: E402
+
+
+def build_entries(count):
+    user = User(id=1, email='bench@example.com', name='Bench')
+    food = FoodItem(id=1, name='Greek yoghurt', calories=decimal.Decimal('97.00'))
+    now = timezone.now()
+    return [
+        FoodLogEntry(
+            id=i, user=user, food_item=food, food_name=food.name,
+            quantity=decimal.Decimal('150.00'), quantity_unit='g',
+            calories_consumed=decimal.Decimal('145.50'), protein_consumed=decimal.Decimal('13.50'),
+            carbs_consumed=decimal.Decimal('5.40'), fat_consumed=decimal.Decimal('7.50'),
+            sugars_consumed=decimal.Decimal('4.50'), fiber_consumed=decimal.Decimal('0.00'),
+            log_date=now.date(), created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+def report(label, func, repeat):
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{label:<32} {best * 1000:9.2f} ms")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--entries', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    data = FoodLogEntrySerializer(build_entries(args.entries), many=True).data
+    summary = {'date': '2025-01-01', 'total_calories': decimal.Decimal('2150.25'), 'log_entries': data}
+    print(f"{args.entries} entries, orjson {'available' if orjson else 'NOT installed'}")
+
+    baseline = report("JSONRenderer", lambda: JSONRenderer().render(summary), args.repeat)
+    fast = report("FastJSONRenderer", lambda: FastJSONRenderer().render(summary), args.repeat)
+    print(f"{'speedup':<32} {baseline / fast:9.2f} x")
+
+    body = FastJSONRenderer().render(summary)
+    assert body == JSONRenderer().render(summary), "renderers disagree"
+    print(f"\n{'uncompressed':<32} {len(body):9d} bytes")
+    report("gzip (level 6)", lambda: gzip.compress(body, 6), args.repeat)
+    print(f"{'gzip size':<32} {len(gzip.compress(body, 6)):9d} bytes")
+    if brotli:
+        report("brotli (quality 4)", lambda: brotli.compress(body, quality=4), args.repeat)
+        print(f"{'brotli size':<32} {len(brotli.compress(body, quality=4)):9d} bytes")
+
+
+if __name__ == '__main__':
+    main()
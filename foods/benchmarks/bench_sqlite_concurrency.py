@@ -0,0 +1,117 @@
+"""
+Compares SQLite read/write throughput under several worker processes with the stock settings
+(rollback journal, a new connection per operation) vs the production profile from settings
+(SQLITE_PRAGMAS, IMMEDIATE transactions, one persistent connection per worker).
+
+Usage: python foods/benchmarks/bench_sqlite_concurrency.py [--writers 4] [--readers 8] [--seconds 5]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foods.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+
+USERS = 200
+SCHEMA = """
+CREATE TABLE log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    log_date TEXT NOT NULL,
+    calories NUMERIC NOT NULL
+);
+CREATE INDEX log_user_date ON log (user_id, log_date);
+"""
+
+
+def connect(path, production):
+    conn = sqlite3.connect(path, isolation_level=None)
+    if production:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+    return conn
+
+
+def worker(path, role, production, seconds, results):
+    random.seed(os.getpid())
+    ops, errors = 0, 0
+    conn = connect(path, production) if production else None
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        # Stock Django (CONN_MAX_AGE=0) opens a connection per request
+        db = conn or connect(path, production)
+        user_id = random.randrange(USERS)
+        try:
+            if role == 'write':
+                db.execute("BEGIN IMMEDIATE" if production else "BEGIN")
+                db.execute("INSERT INTO log (user_id, log_date, calories) VALUES (?, date('now'), ?)",
+                           (user_id, random.random() * 500))
+                db.execute("COMMIT")
+            else:
+                db.execute("SELECT SUM(calories), COUNT(*) FROM log WHERE user_id = ? AND log_date = date('now')",
+                           (user_id,)).fetchone()
+            ops += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+        finally:
+            if conn is None:
+                db.close()
+    results.put((role, ops, errors))
+
+
+def run(label, production, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'bench.sqlite3')
+        setup = connect(path, production)
+        setup.executescript(SCHEMA)
+        setup.executemany("INSERT INTO log (user_id, log_date, calories) VALUES (?, date('now', ?), ?)",
+                          [(i % USERS, f'-{i % 365} days', 100) for i in range(50_000)])
+        setup.commit()
+        setup.close()
+
+        results = multiprocessing.Queue()
+        roles = ['write'] * args.writers + ['read'] * args.readers
+        procs = [multiprocessing.Process(target=worker, args=(path, role, production, args.seconds, results))
+                 for role in roles]
+        for proc in procs:
+            proc.start()
+        totals = {'write': [0, 0], 'read': [0, 0]}
+        for _ in procs:
+            role, ops, errors = results.get()
+            totals[role][0] += ops
+            totals[role][1] += errors
+        for proc in procs:
+            proc.join()
+
+    print(f"{label:<12} writes {totals['write'][0] / args.seconds:9.0f}/s ({totals['write'][1]} errors)   "
+          f"reads {totals['read'][0] / args.seconds:9.0f}/s ({totals['read'][1]} errors)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writer and {args.readers} reader processes, {args.seconds}s each")
+    run("default", False, args)
+    run("production", True, args)
+
+
+if __name__ == '__main__':
+    main()
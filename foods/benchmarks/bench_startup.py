@@ -0,0 +1,73 @@
+"""
+Measures cold-start time: `manage.py check`, importing the WSGI app, and the WSGI app plus the URLconf
+(what a worker loads before serving its first request), each in a fresh interpreter. With --imports,
+also lists the slowest modules from `python -X importtime` for the WSGI app plus URLconf.
+
+Usage: python foods/benchmarks/bench_startup.py [--repeat 10] [--imports 20]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+WSGI = "import foods.wsgi"
+WSGI_URLS = "import foods.wsgi; from django.urls import get_resolver; get_resolver().url_patterns"
+
+CASES = [
+    ("python -c 'pass'", [sys.executable, '-c', 'pass']),
+    ("manage.py check", [sys.executable, 'manage.py', 'check']),
+    ("import foods.wsgi", [sys.executable, '-c', WSGI]),
+    ("foods.wsgi + URLconf", [sys.executable, '-c', WSGI_URLS]),
+]
+
+
+def run(command, env):
+    start = time.perf_counter()
+    subprocess.run(command, cwd=PROJECT_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def slowest_imports(env, count):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', WSGI_URLS],
+        cwd=PROJECT_DIR, env=env, check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)', line)
+        # Top-level imports only, their cumulative time includes everything they pull in
+        if match and len(match.group(3)) == 1:
+            rows.append((int(match.group(2)), match.group(4)))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--imports', type=int, default=0, help="Also list the N slowest top-level imports.")
+    args = parser.parse_args()
+
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'foods.settings'}
+    # Warm the bytecode and OS file caches, so the numbers don't depend on which case ran first
+    for _, command in CASES:
+        run(command, env)
+
+    print(f"{'':<24} {'min':>9} {'median':>9}")
+    for label, command in CASES:
+        times = [run(command, env) for _ in range(args.repeat)]
+        print(f"{label:<24} {min(times) * 1000:7.1f}ms {statistics.median(times) * 1000:7.1f}ms")
+
+    if args.imports:
+        print("\nSlowest imports (WSGI app + URLconf):")
+        for cumulative, module in slowest_imports(env, args.imports):
+            print(f"{module:<48} {cumulative / 1000:7.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foods.settings')
+# Tells the apps this is a web server process, e.g. to warm caches (foodtracker.warmup)
+os.environ.setdefault('FOODS_WEB_SERVER', 'true')
 
 application = get_asgi_application()
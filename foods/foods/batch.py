@@ -0,0 +1,121 @@
+"""
+Batch endpoint: several GET API calls in one round trip, e.g. the profile, today's summary and today's
+logs on app launch. The batch request is authenticated once; every sub-request runs in-process on the
+same thread (so the same database connections) with that user, skipping the JWT decode and user lookup.
+"""
+import copy
+import logging
+from django.conf import settings
+from django.http import HttpResponse, QueryDict
+from django.urls import Resolver404, resolve
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from .renderers import FastJSONRenderer
+
+logger = logging.getLogger(__name__)
+
+# Sub-responses are embedded as-is, the batch response is compressed once by the middleware;
+# conditional headers meant for the batch must not turn sub-responses into bodiless 304s
+STRIPPED_HEADERS = ('HTTP_ACCEPT_ENCODING', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE')
+# Passed on, so clients can revalidate single resources later
+FORWARDED_HEADERS = ('ETag', 'Last-Modified')
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=['GET'], default='GET')
+    path = serializers.RegexField(
+        r'^/api/',
+        max_length=2000,
+        help_text=_("API path with its query string, e.g. /api/foodtracker/logs/?date=2026-01-31")
+    )
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchRequestSerializer(many=True, min_length=1, max_length=settings.BATCH_MAX_REQUESTS)
+
+
+def _sub_request(request, path, query_string):
+    """
+    A copy of the batch's HttpRequest for a GET of another path, authenticated as the batch's user.
+    """
+    sub = copy.copy(request._request)
+    sub.method = 'GET'
+    sub.path = sub.path_info = path
+    sub.META = {key: value for key, value in request.META.items() if key not in STRIPPED_HEADERS}
+    sub.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query_string, HTTP_ACCEPT='application/json')
+    sub.GET = QueryDict(query_string)
+    sub._body = b''
+    # Picked up by DRF's Request in place of the view's authenticators
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+def _error(status_code, detail):
+    return HttpResponse(
+        FastJSONRenderer().render({"detail": detail}), status=status_code, content_type='application/json',
+    )
+
+
+def run_sub_request(request, full_path):
+    path, query_string = full_path.partition('?')[::2]
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return _error(status.HTTP_404_NOT_FOUND, _("Not found."))
+    if match.view_name == 'api-batch':
+        return _error(status.HTTP_400_BAD_REQUEST, _("Batches can't be nested."))
+
+    sub = _sub_request(request, path, query_string)
+    sub.resolver_match = match
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+    except Exception:
+        logger.exception("Batch sub-request failed: GET %s", full_path)
+        return _error(status.HTTP_500_INTERNAL_SERVER_ERROR, _("Server error."))
+    return response
+
+
+def _part(path, response):
+    """
+    One sub-response as JSON bytes, its body spliced in without being parsed again.
+    """
+    head = {
+        "path": path,
+        "status": response.status_code,
+        "headers": {header: response[header] for header in FORWARDED_HEADERS if response.has_header(header)},
+    }
+    content_type = response.get('Content-Type', '')
+    if response.content and content_type.startswith('application/json'):
+        body = response.content
+    else:
+        body = FastJSONRenderer().render(response.content.decode(response.charset, 'replace') or None) or b'null'
+    return FastJSONRenderer().render(head)[:-1] + b',"body":' + body + b'}'
+
+
+class BatchView(APIView):
+    """
+    Runs up to BATCH_MAX_REQUESTS GET API calls and returns their responses together, in order:
+    {"responses": [{"path", "status", "headers": {ETag, Last-Modified}, "body"}]}.
+    A failing sub-request only fails its own entry.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BatchSerializer
+    # Each sub-request is throttled by its own view
+    throttle_classes = []
+    # Only GETs inside: reads may go to replicas, and the user isn't pinned to the primary
+    read_only = True
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        parts = [
+            _part(item['path'], run_sub_request(request, item['path']))
+            for item in serializer.validated_data['requests']
+        ]
+        return HttpResponse(b'{"responses":[' + b','.join(parts) + b']}', content_type='application/json')
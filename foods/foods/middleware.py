@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from .routers import pin_user_to_primary, reset_reads_on_primary, set_reads_on_primary
+
+try:
+    import brotli
+except ImportError:  # optional dependency, responses are gzipped instead
+    brotli = None
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses with Brotli when the client accepts `br` and the brotli package is
+    installed, otherwise behaves exactly like Django's GZipMiddleware.
+    """
+
+    def process_response(self, request, response):
+        ae = request.META.get("HTTP_ACCEPT_ENCODING", "")
+        if brotli is None or response.streaming or not re_accepts_brotli.search(ae):
+            return super().process_response(request, response)
+
+        # Same rules as GZipMiddleware: skip tiny or already encoded responses
+        if len(response.content) < 200 or response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed_content = brotli.compress(response.content, quality=settings.BROTLI_QUALITY)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+        # The encoded bytes differ from the original, so a strong ETag must become weak
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+
+def is_read_only_view(request):
+    """
+    True for unsafe-method views that only read, marked with `read_only = True` (e.g. the batch endpoint).
+    """
+    try:
+        view = resolve(request.path_info).func
+    except Resolver404:
+        return False
+    return getattr(getattr(view, 'view_class', None), 'read_only', False)
+
+
+class ReplicaPinningMiddleware:
+    """
+    Keeps read-your-writes consistency when reads go to replicas (see PrimaryReplicaRouter).
+
+    Unsafe requests read from the primary, except for read-only views. After a successful write the
+    client is pinned to the primary for REPLICA_PIN_SECONDS: by user id (checked by
+    CachedJWTAuthentication, as JWT users are only known inside the view) and by a short-lived
+    cookie for session clients.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        writing = request.method not in SAFE_METHODS and not is_read_only_view(request)
+        token = set_reads_on_primary(writing or settings.REPLICA_PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_reads_on_primary(token)
+
+        if writing and response.status_code < 400:
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                pin_user_to_primary(user.pk)
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax',
+            )
+        return response
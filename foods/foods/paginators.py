@@ -0,0 +1,50 @@
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap enough
+EXACT_COUNT_LIMIT = 10000
+
+
+def estimated_row_count(model, using):
+    """
+    The planner's row estimate for the model's table, None when the database keeps none.
+    PostgreSQL updates it on VACUUM/ANALYZE, SQLite only on ANALYZE (sqlite_stat1).
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql, params = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [connection.ops.quote_name(table)]
+    elif connection.vendor == 'sqlite':
+        # The first number of a stat row is the table's (or index's) row count
+        sql, params = "SELECT stat FROM sqlite_stat1 WHERE tbl = %s ORDER BY idx IS NULL DESC LIMIT 1", [table]
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        # e.g. sqlite_stat1 doesn't exist before the first ANALYZE
+        return None
+    if row is None or row[0] is None:
+        return None
+    count = int(str(row[0]).split()[0])
+    return count if count >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists of very large tables: the unfiltered list is counted from the
+    database's statistics instead of a COUNT(*) over every row. Filtered lists are counted exactly,
+    they are narrowed by an index (user, date) first.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
@@ -0,0 +1,68 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# True while the current request/job must read from the primary (it wrote, or just did)
+_reads_on_primary = ContextVar('reads_on_primary', default=False)
+
+
+def primary_pin_key(user_id):
+    return f"db_primary_pin_{user_id}"
+
+
+def pin_user_to_primary(user_id):
+    """
+    Sends this user's reads to the primary for REPLICA_PIN_SECONDS, longer than the replicas lag,
+    so they always read what they just wrote.
+    """
+    cache.set(primary_pin_key(user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def set_reads_on_primary(value=True):
+    return _reads_on_primary.set(value)
+
+
+def reset_reads_on_primary(token):
+    _reads_on_primary.reset(token)
+
+
+@contextmanager
+def reads_on_primary():
+    token = set_reads_on_primary()
+    try:
+        yield
+    finally:
+        reset_reads_on_primary(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads of the foodtracker and users apps to a random DATABASE_REPLICAS alias and every
+    write to the primary ('default').
+    Reads stay on the primary when the request is pinned (see ReplicaPinningMiddleware) or when
+    they run inside a transaction on the primary, e.g. select_for_update().
+    """
+    route_app_labels = {'foodtracker', 'users'}
+
+    def db_for_read(self, model, **hints):
+        if not settings.DATABASE_REPLICAS or model._meta.app_label not in self.route_app_labels:
+            return None
+        if _reads_on_primary.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        # Objects read from a replica must still be saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
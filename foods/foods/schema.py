@@ -0,0 +1,96 @@
+"""
+The OpenAPI schema is generated once, by `manage.py build_openapi_schema` at deploy time or on the first
+request for it, and served as a file. Swagger UI and ReDoc load it from there (SPEC_URL), so docs hits
+never make drf-yasg introspect every view and serializer.
+
+drf-yasg's views pull in jsonschema, requests and the swagger validators, so they are only imported
+when the schema is built or a docs page is opened, not when a worker starts.
+"""
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import last_modified, require_safe
+
+_build_lock = threading.Lock()
+_built = False
+_ui_views = {}
+
+
+def schema_info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="Food API",
+        default_version='v1',
+        description="API documentation for Foods",
+        terms_of_service="https://www.example.com/terms/",
+        contact=openapi.Contact(email="contact@example.com"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+def build_schema(path=None):
+    """
+    Generates the public schema and writes it to OPENAPI_SCHEMA_FILE, atomically so it is never
+    served half written. Returns the path.
+    """
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    global _built
+    path = Path(path or settings.OPENAPI_SCHEMA_FILE)
+    schema = OpenAPISchemaGenerator(schema_info()).get_schema(request=None, public=True)
+    content = OpenAPICodecJson(validators=[]).encode(schema)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    tmp_path.replace(path)
+    _built = True
+    return path
+
+
+def _schema_path():
+    """
+    The schema file, built first if missing. In DEBUG it is rebuilt once per process, so the docs
+    follow code changes under runserver's reloader.
+    """
+    path = Path(settings.OPENAPI_SCHEMA_FILE)
+    if (settings.DEBUG and not _built) or not path.exists():
+        with _build_lock:
+            if (settings.DEBUG and not _built) or not path.exists():
+                build_schema(path)
+    return path
+
+
+def _schema_modified(request):
+    return datetime.fromtimestamp(_schema_path().stat().st_mtime, tz=timezone.utc)
+
+
+@require_safe
+@last_modified(_schema_modified)
+def openapi_schema(request):
+    response = FileResponse(_schema_path().open('rb'), content_type='application/json')
+    patch_cache_control(response, public=True, max_age=settings.OPENAPI_SCHEMA_MAX_AGE)
+    return response
+
+
+def schema_ui(renderer):
+    """
+    Swagger UI / ReDoc page for the given renderer, with drf-yasg imported on the first hit. The page
+    itself is cheap, the schema it shows comes from openapi_schema.
+    """
+    def view(request, *args, **kwargs):
+        if renderer not in _ui_views:
+            from drf_yasg.views import get_schema_view
+            from rest_framework import permissions
+
+            schema_view = get_schema_view(schema_info(), public=True, permission_classes=(permissions.AllowAny,))
+            _ui_views[renderer] = schema_view.with_ui(renderer, cache_timeout=0)
+        return _ui_views[renderer](request, *args, **kwargs)
+
+    view.csrf_exempt = True
+    return view
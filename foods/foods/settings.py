@@ -53,19 +53,30 @@ INSTALLED_APPS = [
 ]
 
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'foods.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'foods.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'foods.throttling.AnonSlidingWindowThrottle',
+        'foods.throttling.UserSlidingWindowThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/day',
-        'user': '1000/day'
+        'user': '1000/day',
+        'search': '100/hour',  # each uncached search hits Open Food Facts
+        'barcode': '300/hour',
     },
 }
 
@@ -79,12 +90,19 @@ SIMPLE_JWT = {
     "SIGNING_KEY": config('JWT_SIGNING_KEY'),
 }
 
+# How long CachedJWTAuthentication may reuse a resolved user. Account changes bump a per-user
+# version and invalidate it immediately on a shared cache; with per-process LocMemCache other
+# workers can serve the old user for at most this long.
+AUTH_USER_CACHE_TIMEOUT = config('AUTH_USER_CACHE_TIMEOUT', default=60, cast=int)
+
 
 AUTH_USER_MODEL = 'users.User'
 SITE_ID = 1
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'foods.middleware.CompressionMiddleware',
+    'foods.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -124,6 +142,60 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile: WAL lets readers run alongside the single writer, and each
+# connection is tuned once when opened and then kept alive between requests.
+SQLITE_PRODUCTION = config('SQLITE_PRODUCTION', default=False, cast=bool)
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',  # safe with WAL, fsyncs on checkpoint instead of every commit
+    'mmap_size': 256 * 1024 * 1024,  # 256 MiB memory-mapped reads
+    'cache_size': -64 * 1024,  # negative means KiB, 64 MiB page cache per connection
+    'busy_timeout': 5000,  # ms to wait for the write lock before raising "database is locked"
+    'temp_store': 'MEMORY',
+}
+if SQLITE_PRODUCTION:
+    DATABASES['default'].update({
+        'OPTIONS': {
+            'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+            # Take the write lock when the transaction starts, avoids lock-upgrade deadlocks between writers
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'CONN_MAX_AGE': config('CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+    })
+
+# Read replicas of the default database, as SQLite files for local testing,
+# e.g. DATABASE_REPLICAS=replica1.sqlite3,replica2.sqlite3 (copies of db.sqlite3)
+DATABASE_REPLICAS = []
+for index, replica_name in enumerate(filter(None, config('DATABASE_REPLICAS', default='').split(','))):
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / replica_name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+# Extra databases FoodLogEntry rows are sharded across by user, as SQLite files for local testing,
+# e.g. FOOD_LOG_SHARDS=food_logs_1.sqlite3,food_logs_2.sqlite3. 'default' is always shard 0.
+FOOD_LOG_SHARDS = ['default']
+for index, shard_name in enumerate(filter(None, config('FOOD_LOG_SHARDS', default='').split(',')), start=1):
+    alias = f'food_logs_{index}'
+    DATABASES[alias] = {**DATABASES['default'], 'NAME': BASE_DIR / shard_name.strip()}
+    FOOD_LOG_SHARDS.append(alias)
+# How long a user's shard is cached. Moving users between shards needs REDIS_URL: with a per-process
+# cache, other workers would keep using the old shard until their cached alias expires
+FOOD_LOG_SHARD_CACHE_TIMEOUT = config('FOOD_LOG_SHARD_CACHE_TIMEOUT', default=60, cast=int)
+
+DATABASE_ROUTERS = [
+    'foodtracker.routers.FoodLogShardRouter',
+    'foods.routers.PrimaryReplicaRouter',
+]
+
+# After a write, a user's reads stay on the primary this long; keep it above the replication lag
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+REPLICA_PIN_COOKIE = 'db_primary_pin'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -178,6 +250,12 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 EMAIL_VERIFICATION_TIMEOUT_HOURS = 24
 PASSWORD_RESET_TIMEOUT_HOURS = 1
 
+# Outgoing emails are queued and delivered by `manage.py send_queued_emails`
+EMAIL_OUTBOX_BATCH_SIZE = config('EMAIL_OUTBOX_BATCH_SIZE', default=50, cast=int)
+EMAIL_OUTBOX_MAX_ATTEMPTS = config('EMAIL_OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+EMAIL_OUTBOX_RETRY_BASE_SECONDS = 60  # doubled after every failed attempt
+EMAIL_OUTBOX_LEASE_SECONDS = 300  # how long a worker owns a claimed batch
+
 
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
@@ -187,9 +265,18 @@ SWAGGER_SETTINGS = {
             'in': 'header',
             'description': "JWT Authorization header. Example: 'Bearer your_token_here'",
         }
-    }
+    },
+    # Both UIs load the prebuilt schema file instead of having drf-yasg generate it on each hit
+    'SPEC_URL': 'openapi-schema',
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': 'openapi-schema',
 }
 
+# Written by `manage.py build_openapi_schema` (or on the first request for /openapi.json)
+OPENAPI_SCHEMA_FILE = config('OPENAPI_SCHEMA_FILE', default=str(BASE_DIR / 'static' / 'openapi.json'))
+OPENAPI_SCHEMA_MAX_AGE = 60 * 60
+
 # CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=False, cast=bool)
 CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='').split(',') if not CORS_ALLOW_ALL_ORIGINS else []
@@ -197,10 +284,87 @@ CORS_ALLOWED_ORIGINS = config('CORS_ALLOWED_ORIGINS', default='').split(',') if
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Avatar variants produced by `manage.py process_avatars`: name -> (square size in px, format)
+AVATAR_VARIANTS = {
+    'thumbnail': (96, 'JPEG'),
+    'thumbnail_webp': (96, 'WEBP'),
+    'large_webp': (384, 'WEBP'),
+}
+AVATAR_QUALITY = 82
+
+# Food log entries older than this are moved to ArchivedFoodLogDay by `manage.py archive_food_logs`
+FOOD_LOG_ARCHIVE_AFTER_DAYS = config('FOOD_LOG_ARCHIVE_AFTER_DAYS', default=730, cast=int)
+
+# Barcode lookups: products found remotely (but not saved as food items) and unknown barcodes are cached,
+# so rescans don't reach Open Food Facts; misses expire sooner as products get added there over time
+BARCODE_CACHE_TIMEOUT = 60 * 60 * 24 * 7
+BARCODE_MISS_CACHE_TIMEOUT = 60 * 60 * 24
+BARCODE_LOOKUP_WORKERS = 8  # concurrent Open Food Facts requests per batch lookup
+BARCODE_BATCH_MAX = 50
+
+# Food search results are shared by all users (empty ones and local matches only briefly); searches are
+# counted in memory and written to PopularSearch at most this often per worker
+SEARCH_CACHE_TIMEOUT = 60 * 60
+SEARCH_EMPTY_CACHE_TIMEOUT = 60
+SEARCH_STATS_FLUSH_SECONDS = 60
+
+# Typo-tolerant search over the food catalog (foodtracker/fuzzy.py): each worker keeps an index of about
+# 60 MB per million food items, rebuilt in the background every FUZZY_INDEX_MAX_AGE seconds
+FUZZY_SEARCH_MIN_SIMILARITY = 0.5  # trigram Dice coefficient, "brocoli" vs "broccoli" is 0.8
+FUZZY_SEARCH_LIMIT = 20
+FUZZY_MAX_POSTINGS = 1000  # food items looked at per matched word, bounds the query time
+FUZZY_INDEX_MAX_AGE = 60 * 60
+
+# `manage.py dedupe_food_items`: items with the same normalized name are merged when every nutrient known
+# for both differs by at most this fraction
+DEDUPE_NUTRIENT_TOLERANCE = 0.05
+
+# GET sub-requests one call to /api/batch/ may make
+BATCH_MAX_REQUESTS = 10
+
+# Delta sync (foodtracker/sync.py): entries and tombstones per page, creates/updates/deletions a client
+# may push per call, how far the cursor stays behind now, and how long deletions are kept for sync clients
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_CHANGES = 200
+SYNC_CURSOR_LAG_SECONDS = 5
+SYNC_TOMBSTONE_DAYS = config('SYNC_TOMBSTONE_DAYS', default=90, cast=int)
+
+# Cache warm-up (`manage.py warm_caches`, and at worker startup when CACHE_WARMUP_ON_STARTUP is on):
+# the most popular searches of the last CACHE_WARMUP_SEARCH_DAYS days and today's summary of users who
+# logged food in the last CACHE_WARMUP_ACTIVE_HOURS hours, CACHE_WARMUP_WORKERS at a time, for at most
+# CACHE_WARMUP_SECONDS
+CACHE_WARMUP_ON_STARTUP = config('CACHE_WARMUP_ON_STARTUP', default=False, cast=bool)
+CACHE_WARMUP_SEARCHES = config('CACHE_WARMUP_SEARCHES', default=100, cast=int)
+CACHE_WARMUP_SEARCH_DAYS = 7
+CACHE_WARMUP_USERS = config('CACHE_WARMUP_USERS', default=500, cast=int)
+CACHE_WARMUP_ACTIVE_HOURS = 24
+CACHE_WARMUP_WORKERS = 4
+CACHE_WARMUP_SECONDS = config('CACHE_WARMUP_SECONDS', default=60, cast=int)
+
+# Foods remembered per user for quick-add, the least recently logged ones are dropped first
+QUICK_ADD_MAX_FOODS = 100
+
+# Brotli level used by CompressionMiddleware, 4-5 compresses about as well as gzip -6 but faster
+BROTLI_QUALITY = 4
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-calorie-tracker-cache',
         'TIMEOUT': 300,  # 5 minutes cache
     }
-}
\ No newline at end of file
+}
+
+# Use a shared Redis cache in production so throttle counters, auth versions and cached
+# results are shared by every worker process instead of living in each one's memory.
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+        'TIMEOUT': 300,
+    }
+
+# Change versions of food logs (ETags, cached summaries). A shared cache sees every bump, so they can
+# live forever; each worker's own cache only notices another worker's writes once its copy expires
+LOG_VERSION_CACHE_TIMEOUT = None if REDIS_URL else config('LOG_VERSION_CACHE_TIMEOUT', default=60, cast=int)
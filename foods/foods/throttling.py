@@ -0,0 +1,89 @@
+from rest_framework.throttling import AnonRateThrottle, ScopedRateThrottle, UserRateThrottle
+
+
+class SlidingWindowThrottleMixin:
+    """
+    Sliding-window counter rate limiting for DRF throttles.
+
+    Instead of the per-client timestamp list DRF keeps by default, each client uses two integer
+    counters (the current and the previous fixed window). The previous window is weighted by how
+    much of it still overlaps the sliding window, so memory per client is constant.
+    Counters are updated with cache.incr(), which is atomic on Redis/Memcached, so limits hold
+    exactly across all worker processes sharing the cache.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        current_key = f"{self.key}:{window}"
+        previous_key = f"{self.key}:{window - 1}"
+
+        counts = self.cache.get_many([previous_key, current_key])
+        self.previous_count = counts.get(previous_key, 0)
+        self.current_count = counts.get(current_key, 0)
+        if self.estimate() >= self.num_requests:
+            return self.throttle_failure()
+
+        # Keep the counter alive for two windows, it is still read as the "previous" one next window
+        self.cache.add(current_key, 0, self.duration * 2)
+        try:
+            self.current_count = self.cache.incr(current_key)
+        except ValueError:
+            # The counter expired or was evicted between add() and incr()
+            self.cache.set(current_key, 1, self.duration * 2)
+            self.current_count = 1
+
+        # Re-check with our own increment so concurrent requests can't overshoot the limit
+        if self.estimate() > self.num_requests:
+            return self.throttle_failure()
+        return self.throttle_success()
+
+    def estimate(self):
+        overlap = (self.duration - self.elapsed) / self.duration
+        return self.previous_count * overlap + self.current_count
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        remaining = self.duration - self.elapsed
+        if self.current_count >= self.num_requests:
+            # Wait for the next window, then until this window's weight has decayed enough
+            decay = self.duration * (1 - self.num_requests / self.current_count)
+            return remaining + max(decay, 0)
+        if self.previous_count:
+            # Wait until the previous window's weight has decayed enough
+            needed = self.duration * (1 - (self.num_requests - self.current_count) / self.previous_count)
+            return max(needed - self.elapsed, 0)
+        return remaining
+
+
+class AnonSlidingWindowThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class UserSlidingWindowThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    pass
+
+
+class ScopedSlidingWindowThrottle(SlidingWindowThrottleMixin, ScopedRateThrottle):
+    """
+    Per-view budget, selected with the view's `throttle_scope` (e.g. 'search').
+    """
+
+    def allow_request(self, request, view):
+        # Same scope lookup as ScopedRateThrottle, which resolves the rate per view
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
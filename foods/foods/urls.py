@@ -13,23 +13,8 @@ from rest_framework_simplejwt.views import (
 )
 from django.conf import settings
 from django.conf.urls.static import static
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-
-# Schema configuration for API documentation
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Food API",
-        default_version='v1',
-        description="API documentation for Foods",
-        terms_of_service="https://www.example.com/terms/",
-        contact=openapi.Contact(email="contact@example.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from .batch import BatchView
+from .schema import openapi_schema, schema_ui
 
 # JWT Authentication URLs
 auth_urlpatterns = [
@@ -43,6 +28,7 @@ api_urlpatterns = [
     path('auth/', include(auth_urlpatterns)),
     path('users/', include('users.api_urls')),
     path('foodtracker/', include('foodtracker.urls')),
+    path('batch/', BatchView.as_view(), name='api-batch'),
 ]
 
 urlpatterns = [
@@ -54,10 +40,9 @@ urlpatterns = [
     
     
     # Documentation
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), 
-         name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), 
-         name='schema-redoc'),
+    path('openapi.json', openapi_schema, name='openapi-schema'),
+    path('swagger/', schema_ui('swagger'), name='schema-swagger-ui'),
+    path('redoc/', schema_ui('redoc'), name='schema-redoc'),
     
     # Health check
     path('health/', include('health_check.urls')),
@@ -1,16 +1,75 @@
-from django.contrib import admin
-from .models import FoodItem, FoodLogEntry
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import SEARCH_VAR
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from foods.paginators import EstimatedCountPaginator
+from .models import ArchivedFoodLogDay, FoodItem, FoodLogEntry, RecipeIngredient
+from .recipes import update_recipes
+from .sharding import get_user_shard
 
 # Register your models here.
 
+class RecipeIngredientInline(admin.TabularInline):
+    model = RecipeIngredient
+    fk_name = 'recipe'
+    raw_id_fields = ('ingredient',)
+    extra = 0
+
+
 @admin.register(FoodItem)
 class FoodItemAdmin(admin.ModelAdmin):
+    inlines = (RecipeIngredientInline,)
     list_display = ('name', 'calories', 'sugars', 'fiber', 'unit', 'external_api_id', 'created_by')
     search_fields = ('name', 'external_api_id')
     list_filter = ('unit',)
     # Optionally, if you want to make it easier to add/edit created_by in admin
     # raw_id_fields = ('created_by',)
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        if form.instance.is_recipe:
+            # Ingredients may have changed, recompute the recipe and the recipes using it
+            update_recipes([form.instance.pk])
+
+
+class UserAutocompleteFilter(admin.SimpleListFilter):
+    """
+    Filters by one user picked with the admin's autocomplete (searching UserAdmin.search_fields),
+    instead of listing every user in the sidebar.
+    """
+    title = _("user")
+    parameter_name = 'user'
+    template = 'admin/foodtracker/autocomplete_filter.html'
+    widget_id = 'user-autocomplete-filter'
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+        # The widget loads just the selected user to show it
+        field = forms.ModelChoiceField(
+            queryset=get_user_model().objects.all(),
+            widget=AutocompleteSelect(model._meta.get_field('user'), model_admin.admin_site),
+        )
+        value = self.value() if self.value() and self.value().isdigit() else None
+        self.widget = field.widget.render('user_filter', value, attrs={'id': self.widget_id})
+
+    def has_output(self):
+        return True
+
+    def lookups(self, request, model_admin):
+        # Picked in the widget, the sidebar only lists "All"
+        return []
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user_id=self.value() if self.value().isdigit() else None)
+        return queryset
+
 
 @admin.register(FoodLogEntry)
 class FoodLogEntryAdmin(admin.ModelAdmin):
@@ -20,13 +79,107 @@ class FoodLogEntryAdmin(admin.ModelAdmin):
         'sugars_consumed', 'fiber_consumed', # <--- NEW FIELDS
         'created_at'
     )
-    list_filter = ('user', 'log_date', 'quantity_unit')
-    search_fields = ('user__email', 'user__name', 'food_name')
-    date_hierarchy = 'log_date' # Adds a date navigation bar
-    # raw_id_fields allows you to search for user/food_item by ID, useful for many entries
-    raw_id_fields = ('user', 'food_item')
+    # The table gets very large: no filter or date_hierarchy that scans it for its distinct values,
+    # rows joined with their user, and counts taken from the database's statistics when unfiltered
+    list_filter = (UserAutocompleteFilter, 'log_date')
+    list_select_related = ('user',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_help_text = _("A user's email or id, or the start of a food name.")
+    autocomplete_fields = ('user', 'food_item')
     readonly_fields = (
         'calories_consumed', 'protein_consumed', 'carbs_consumed', 'fat_consumed',
         'sugars_consumed', 'fiber_consumed', # <--- NEW FIELDS
         'created_at', 'updated_at'
     )
+
+    def get_shard(self, request):
+        """
+        The shard the changelist reads: that of the user it is filtered or searched by (email or id),
+        else 'default'. Entries of users on other shards are only listed for one user at a time.
+        """
+        if len(settings.FOOD_LOG_SHARDS) == 1:
+            return DEFAULT_DB_ALIAS
+        user_id = request.GET.get(UserAutocompleteFilter.parameter_name, '')
+        if not user_id.isdigit():
+            term = request.GET.get(SEARCH_VAR, '').strip()
+            if '@' in term:
+                user_id = get_user_model().objects.filter(email=term).values_list('pk', flat=True).first()
+            else:
+                user_id = term if term.isdigit() else None
+        return get_user_shard(int(user_id)) if user_id else DEFAULT_DB_ALIAS
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        alias = self.get_shard(request)
+        if alias != DEFAULT_DB_ALIAS:
+            # Shards don't hold the users table, the page's users are read from 'default' in one query
+            queryset = queryset.using(alias).prefetch_related('user')
+        return queryset
+
+    def get_list_select_related(self, request):
+        return self.list_select_related if self.get_shard(request) == DEFAULT_DB_ALIAS else ()
+
+    def get_object(self, request, object_id, from_field=None):
+        # Ids are unique across shards, look on each until found
+        queryset = super().get_queryset(request)
+        field = queryset.model._meta.pk if from_field is None else queryset.model._meta.get_field(from_field)
+        try:
+            object_id = field.to_python(object_id)
+        except (ValidationError, ValueError):
+            return None
+        for alias in settings.FOOD_LOG_SHARDS:
+            entry = queryset.using(alias).filter(**{field.name: object_id}).first()
+            if entry is not None:
+                return entry
+        return None
+
+    def changelist_view(self, request, extra_context=None):
+        if len(settings.FOOD_LOG_SHARDS) > 1 and self.get_shard(request) == DEFAULT_DB_ALIAS:
+            self.message_user(request, _(
+                "Only entries on the 'default' database are listed. Filter or search by a user "
+                "to see the entries of users on other shards."
+            ), messages.INFO)
+        return super().changelist_view(request, extra_context)
+
+    @property
+    def media(self):
+        # For UserAutocompleteFilter, the change form already has it
+        widget = AutocompleteSelect(FoodLogEntry._meta.get_field('user'), self.admin_site)
+        return super().media + widget.media
+
+    def get_search_fields(self, request):
+        # Only enables the search box, get_search_results() does the (indexed) lookups
+        return ('food_name',)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Index-backed lookups only: exact email (unique index) or user id, otherwise a food name prefix
+        as typed, lowercase or capitalized (range scans of the food_name index).
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if '@' in term:
+            user_ids = get_user_model().objects.filter(email=term).values_list('pk', flat=True)
+            return queryset.filter(user_id__in=list(user_ids)), False
+        if term.isdigit():
+            return queryset.filter(user_id=term), False
+        prefixes = Q()
+        for prefix in {term, term.lower(), term[:1].upper() + term[1:].lower()}:
+            prefixes |= Q(food_name__gte=prefix, food_name__lt=prefix + '\U0010ffff')
+        return queryset.filter(prefixes), False
+
+
+@admin.register(ArchivedFoodLogDay)
+class ArchivedFoodLogDayAdmin(admin.ModelAdmin):
+    list_display = ('user', 'log_date', 'entry_count', 'total_calories', 'archived_at')
+    date_hierarchy = 'log_date'
+    raw_id_fields = ('user',)
+    # Written by the archive_food_logs command only
+    exclude = ('entries',)
+    readonly_fields = (
+        'user', 'log_date', 'entry_count',
+        'total_calories', 'total_protein', 'total_carbs', 'total_fat', 'total_sugars', 'total_fiber',
+        'archived_at',
+    )
@@ -2,139 +2,43 @@ from rest_framework import generics, status, serializers
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
-from django.db.models import Sum
+from django.db.models import ProtectedError
 from .models import FoodItem, FoodLogEntry
-from .serializer import FoodItemSerializer, FoodLogEntrySerializer, FoodSearchSerializer
+from .serializer import (
+    BarcodeLookupSerializer, CopyFoodLogEntriesSerializer, FoodFilterSerializer, FoodItemSerializer, FoodLogEntrySerializer,
+    FoodSearchSerializer, FrequentFoodSerializer, QuickAddQuerySerializer, RecipeSerializer, SyncSerializer
+)
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-import requests
 import decimal
 from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from foods.response_cache import cached_json_response
+from foods.throttling import ScopedSlidingWindowThrottle, UserSlidingWindowThrottle
+from .archive import merge_archived_entries
+from .barcodes import lookup_barcodes
+from .copying import copy_entries
+from .nutrient_filter import filter_foods, nutrient_ranges
+from .quick_add import get_quick_add
+from .search import search_foods
+from .summaries import build_daily_summary, cache_daily_summary, summary_cache_key
+from .sync import apply_client_changes, changes_since
+from .versioning import get_etag, not_modified, set_validators
 
-OPEN_FOOD_FACTS_BASE_URL = "https://world.openfoodfacts.org/cgi/search.pl"
-OPEN_FOOD_FACTS_PRODUCT_URL = "https://world.openfoodfacts.org/api/v0/product/"
-
-def search_food_on_open_food_facts(query):
-    """
-    Searches for food items on Open Food Facts API.
-    Returns a list of dictionaries with basic food info.
-    """
-    params = {
-        'search_terms': query,
-        'json': 1,
-        'page_size': 20 # Limit results to 20 for brevity
-    }
-    try:
-
-        response = requests.get(OPEN_FOOD_FACTS_BASE_URL, params=params, timeout=10)
-
-# Print raw response text
-
-        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
-
-        data = response.json()
-
-
-        if 'products' in data:
-
-            foods = []
-            for product in data['products']:
-                food_name = product.get('product_name') or product.get('product_name_en') or product.get('generic_name')
-                nutriments = product.get('nutriments', {})
-
-
-
-                if food_name: # Only include if a name is found
-                    food_info = {
-                        'name': food_name,
-                        'external_api_id': product.get('code'), # Use product code as external ID
-                        'calories': nutriments.get('energy-kcal_100g'),
-                        'protein': nutriments.get('proteins_100g'),
-                        'carbs': nutriments.get('carbohydrates_100g'),
-                        'fat': nutriments.get('fat_100g'),
-                        'sugars': nutriments.get('sugars_100g'),
-                        'fiber': nutriments.get('fiber_100g'),
-                        'unit': 'g' # Open Food Facts usually provides per 100g
-                    }
-                    foods.append(food_info)
-                
-
-        else:
-            print("DEBUG: 'products' key not found in Open Food Facts response or response is empty.")
-            foods = [] # Ensure foods is empty if 'products' key is missing or response is empty
-
-        return foods
-    except requests.exceptions.RequestException as e:
-
-        return [] # Return empty list on error
-    except ValueError as e: # Catch JSON decoding errors
-
-        return []
-    except Exception as e: # Catch any other unexpected errors
-
-        return []
-
-
-def get_food_details_from_open_food_facts(external_id):
-    """
-    Fetches detailed nutritional information for a specific product from Open Food Facts.
-    """
-    url = f"{OPEN_FOOD_FACTS_PRODUCT_URL}{external_id}.json"
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        if 'product' in data:
-            product = data['product']
-            nutriments = product.get('nutriments', {})
-            
-            food_name = product.get('product_name') or product.get('product_name_en') or product.get('generic_name')
-            
-            # Construct detailed food info
-            detailed_info = {
-                'name': food_name,
-                'external_api_id': product.get('code'),
-                'calories': nutriments.get('energy-kcal_100g'),
-                'protein': nutriments.get('proteins_100g'),
-                'carbs': nutriments.get('carbohydrates_100g'),
-                'fat': nutriments.get('fat_100g'),
-                'unit': 'g',
-                'sugars': nutriments.get('sugars_100g'),
-                'fiber': nutriments.get('fiber_100g'),
-            }
-            return detailed_info
-        return None
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching Open Food Facts details: {e}")
-        return None
-    
 class FoodSearchApiView(APIView):
     permission_classes = [IsAuthenticated]
     serializer_class = FoodSearchSerializer
+    throttle_classes = [UserSlidingWindowThrottle, ScopedSlidingWindowThrottle]
+    throttle_scope = 'search'
     
-    @method_decorator(cache_page(60*5))  # Cache for 5 minutes
     def get(self, request, *args, **kwargs):
-        print("DEBUG: FoodSearchView GET method hit!")
         serializer = self.serializer_class(data=request.query_params)
         serializer.is_valid(raise_exception=True)
         query = serializer.validated_data['query']
 
-        # Create a unique cache key based on the query and user
-        cache_key = f"food_search_{request.user.id}_{query}"
-        cached_results = cache.get(cache_key)
-        
-        if cached_results is not None:
-            return Response(cached_results, status=status.HTTP_200_OK)
-            
-        search_results = search_food_on_open_food_facts(query)
-        
-        # Cache the results for 5 minutes (300 seconds)
-        cache.set(cache_key, search_results, 300)
-        
+        # Cached per query for all users, popular queries are preloaded by `manage.py warm_caches`
+        search_results = search_foods(query)
+
         return Response(search_results, status=status.HTTP_200_OK)
 
 class FoodLogEntryListCreateView(generics.ListCreateAPIView):
@@ -145,15 +49,36 @@ class FoodLogEntryListCreateView(generics.ListCreateAPIView):
         if getattr(self, 'swagger_fake_view', False) or isinstance(self.request.user, AnonymousUser):
             return FoodLogEntry.objects.none()
         
-        queryset = FoodLogEntry.objects.filter(user=self.request.user)
-        log_date_str = self.request.query_params.get('date')
-        if log_date_str:
-            try:
-                log_date = timezone.datetime.strptime(log_date_str, '%Y-%m-%d').date()
-                queryset = queryset.filter(log_date=log_date)
-            except ValueError:
-                raise serializers.ValidationError({"date": _("Invalid date format. UseYYYY-MM-DD.")})
+        queryset = FoodLogEntry.objects.for_user(self.request.user)
+        log_date = self.get_log_date()
+        if log_date:
+            queryset = queryset.filter(log_date=log_date)
         return queryset.order_by('-log_date', '-created_at')
+
+    def get_log_date(self):
+        log_date_str = self.request.query_params.get('date')
+        if not log_date_str:
+            return None
+        try:
+            return timezone.datetime.strptime(log_date_str, '%Y-%m-%d').date()
+        except ValueError:
+            raise serializers.ValidationError({"date": _("Invalid date format. UseYYYY-MM-DD.")})
+
+    def list(self, request, *args, **kwargs):
+        if getattr(self, 'swagger_fake_view', False) or isinstance(request.user, AnonymousUser):
+            return super().list(request, *args, **kwargs)
+
+        # Answer unchanged polls from the cached change version, before any query or serialization
+        etag = get_etag(request.user.pk, self.get_log_date())
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        # Old entries live in the archive, read through to it
+        response.data = merge_archived_entries(request.user, response.data, self.get_log_date())
+        return set_validators(response, etag)
+
     def perform_create(self, serializer):
         food_item_id = self.request.data.get('food_item')
         food_name_input = self.request.data.get('food_name')
@@ -214,6 +139,34 @@ class FoodLogEntryListCreateView(generics.ListCreateAPIView):
             fiber_consumed=fiber_c    # <--- NEW
         )
         
+class CopyFoodLogEntriesView(APIView):
+    """
+    Logs the entries of a date (or selected entries) again on other dates, e.g. "same breakfast as yesterday".
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = CopyFoodLogEntriesSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        entries = FoodLogEntry.objects.for_user(request.user).prefetch_related('food_item')
+        if 'source_date' in data:
+            entries = entries.filter(log_date=data['source_date'])
+        if data.get('entry_ids'):
+            entries = entries.filter(pk__in=data['entry_ids'])
+        entries = list(entries.order_by('created_at'))
+        if not entries:
+            return Response({"detail": _("No entries found to copy.")}, status=status.HTTP_404_NOT_FOUND)
+
+        copies = copy_entries(request.user, entries, data['target_dates'])
+        return Response({
+            "created": len(copies),
+            "entries": FoodLogEntrySerializer(copies, many=True, context={'request': request}).data,
+        }, status=status.HTTP_201_CREATED)
+
+
 class FoodLogEntryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = FoodLogEntrySerializer
     permission_classes = [IsAuthenticated]
@@ -223,7 +176,7 @@ class FoodLogEntryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
         if getattr(self, 'swagger_fake_view', False) or isinstance(self.request.user, AnonymousUser):
             return FoodLogEntry.objects.none()
         
-        return self.queryset.filter(user=self.request.user)
+        return FoodLogEntry.objects.for_user(self.request.user)
 
     def perform_update(self, serializer):
         instance = serializer.instance
@@ -281,7 +234,6 @@ class DailySummaryView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = FoodLogEntrySerializer
     
-    @method_decorator(cache_page(60*15))  # Cache for 15 minutes
     def get(self, request, *args, **kwargs):
         if getattr(self, 'swagger_fake_view', False) or isinstance(request.user, AnonymousUser):
             return Response({
@@ -296,44 +248,179 @@ class DailySummaryView(generics.RetrieveAPIView):
             }, status=status.HTTP_200_OK)
         
         log_date_str = request.query_params.get('date', timezone.now().strftime('%Y-%m-%d'))
-        cache_key = f"daily_summary_{request.user.id}_{log_date_str}"
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            return Response(cached_data, status=status.HTTP_200_OK)
-            
         try:
             log_date = timezone.datetime.strptime(log_date_str, '%Y-%m-%d').date()
         except ValueError:
             return Response({"date": _("Invalid date format. UseYYYY-MM-DD.")},
                           status=status.HTTP_400_BAD_REQUEST)
 
-        daily_logs = FoodLogEntry.objects.filter(
-            user=request.user,
-            log_date=log_date
+        etag = get_etag(request.user.pk, log_date)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+
+        # JSON clients get the final encoded (and pre-compressed) bytes straight from the cache.
+        # The ETag changes with every write to this day, so cached summaries never go stale.
+        if request.accepted_renderer.format != 'json':
+            # e.g. the browsable API, rendered the regular way
+            response_data = build_daily_summary(request.user, log_date)
+            return set_validators(Response(response_data, status=status.HTTP_200_OK), etag)
+
+        entry = cache.get(summary_cache_key(etag))
+        if entry is None:
+            # Cached for 15 minutes
+            entry = cache_daily_summary(request.user, log_date, etag)
+        return set_validators(cached_json_response(request, entry), etag)
+
+
+class SyncView(APIView):
+    """
+    Delta sync for offline clients: GET ?cursor=... pulls the entries created or changed and the ids deleted
+    since the cursor; POST {"cursor", "changes", "deleted"} pushes the client's queued changes first.
+    Follow has_more with the returned cursor; on reset, replace the local copy with what follows.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = SyncSerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return self.sync_response(request, serializer.validated_data.get('cursor'))
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        created, rejected = apply_client_changes(request.user, data.get('changes', []), data.get('deleted', []))
+        # The pushed entries come back in "changes", with their server-computed fields
+        return self.sync_response(request, data.get('cursor'), created=created, rejected=rejected)
+
+    def sync_response(self, request, cursor, **extra):
+        if getattr(self, 'swagger_fake_view', False) or isinstance(request.user, AnonymousUser):
+            return Response({}, status=status.HTTP_200_OK)
+        page = changes_since(request.user, cursor)
+        return Response({
+            "cursor": page['cursor'].encode(),
+            "has_more": page['has_more'],
+            "reset": page['reset'],
+            "changes": FoodLogEntrySerializer(page['changes'], many=True, context={'request': request}).data,
+            "deleted": page['deleted'],
+            **extra,
+        }, status=status.HTTP_200_OK)
+
+
+class QuickAddView(APIView):
+    """
+    The user's recently and frequently logged foods, with the quantity they logged last time.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = QuickAddQuerySerializer
+
+    def get(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        foods = get_quick_add(request.user, serializer.validated_data['limit'])
+        return Response({
+            "recent": FrequentFoodSerializer(foods['recent'], many=True).data,
+            "frequent": FrequentFoodSerializer(foods['frequent'], many=True).data,
+        }, status=status.HTTP_200_OK)
+
+
+class FoodFilterView(APIView):
+    """
+    Local foods filtered by per-100g nutrient ranges and sorted by a nutrient,
+    e.g. ?min_protein=20&max_calories=200&ordering=-protein ("high protein, under 200 kcal").
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = FoodFilterSerializer
+
+    def get(self, request, *args, **kwargs):
+        if getattr(self, 'swagger_fake_view', False) or isinstance(request.user, AnonymousUser):
+            return Response([], status=status.HTTP_200_OK)
+        serializer = self.serializer_class(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        foods = filter_foods(request.user, nutrient_ranges(data), data['ordering'], data['limit'])
+        return Response(FoodItemSerializer(foods, many=True).data, status=status.HTTP_200_OK)
+
+
+class BarcodeLookupView(APIView):
+    """
+    Looks up one scanned barcode. Known codes are answered locally or from the cache, only new ones
+    reach Open Food Facts.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BarcodeLookupSerializer
+    throttle_classes = [UserSlidingWindowThrottle, ScopedSlidingWindowThrottle]
+    throttle_scope = 'barcode'
+
+    def get(self, request, code, *args, **kwargs):
+        serializer = self.serializer_class(data={'codes': [code]})
+        serializer.is_valid(raise_exception=True)
+
+        found, missing, errors = lookup_barcodes([code])
+        if code in found:
+            return Response(found[code], status=status.HTTP_200_OK)
+        if errors:
+            return Response({"detail": _("The product database could not be reached, please try again.")},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({"detail": _("No product found for this barcode.")}, status=status.HTTP_404_NOT_FOUND)
+
+
+class BarcodeBatchLookupView(APIView):
+    """
+    Looks up many scanned barcodes at once: POST {"codes": [...]}, e.g. after scanning offline.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = BarcodeLookupSerializer
+    throttle_classes = [UserSlidingWindowThrottle, ScopedSlidingWindowThrottle]
+    throttle_scope = 'barcode'
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        found, missing, errors = lookup_barcodes(serializer.validated_data['codes'])
+        return Response({
+            "results": found,
+            "missing": missing,
+            "errors": errors,
+        }, status=status.HTTP_200_OK)
+
+
+class RecipeListCreateView(generics.ListCreateAPIView):
+    """
+    The user's recipes. Log a recipe like any food item, by its id and the grams eaten.
+    """
+    serializer_class = RecipeSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False) or isinstance(self.request.user, AnonymousUser):
+            return FoodItem.objects.none()
+        return (
+            FoodItem.objects.filter(is_recipe=True, created_by=self.request.user)
+            .prefetch_related('ingredients__ingredient')
         )
 
-        summary = daily_logs.aggregate(
-            total_calories=Sum('calories_consumed'),
-            total_protein=Sum('protein_consumed'),
-            total_carbs=Sum('carbs_consumed'),
-            total_fat=Sum('fat_consumed'),
-            total_sugars=Sum('sugars_consumed'),
-            total_fiber=Sum('fiber_consumed')
+
+class RecipeRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = RecipeSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False) or isinstance(self.request.user, AnonymousUser):
+            return FoodItem.objects.none()
+        return (
+            FoodItem.objects.filter(is_recipe=True, created_by=self.request.user)
+            .prefetch_related('ingredients__ingredient')
         )
 
-        response_data = {
-            "date": log_date.strftime('%Y-%m-%d'),
-            "total_calories": round(summary['total_calories'] or decimal.Decimal(0), 2),
-            "total_protein": round(summary['total_protein'] or decimal.Decimal(0), 2),
-            "total_carbs": round(summary['total_carbs'] or decimal.Decimal(0), 2),
-            "total_fat": round(summary['total_fat'] or decimal.Decimal(0), 2),
-            "total_sugars": round(summary['total_sugars'] or decimal.Decimal(0), 2),
-            "total_fiber": round(summary['total_fiber'] or decimal.Decimal(0), 2),
-            "log_entries": FoodLogEntrySerializer(daily_logs, many=True, context={'request': request}).data
-        }
-
-        # Cache for 15 minutes (900 seconds)
-        cache.set(cache_key, response_data, 900)
-        
-        return Response(response_data, status=status.HTTP_200_OK)
\ No newline at end of file
+    def perform_destroy(self, instance):
+        try:
+            instance.delete()
+        except ProtectedError:
+            raise serializers.ValidationError({"detail": _("This recipe is an ingredient of another recipe.")})
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class FoodtrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'foodtracker'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .warmup import warm_caches_on_startup
+        warm_caches_on_startup()
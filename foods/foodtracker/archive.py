@@ -0,0 +1,133 @@
+import json
+import zlib
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+from foods.renderers import FastJSONRenderer
+from .models import ArchivedFoodLogDay, FoodLogEntry
+from .serializer import FoodLogEntrySerializer
+from .signals import muted_signals
+
+# ArchivedFoodLogDay total -> the entry field it sums
+TOTAL_FIELDS = {
+    'total_calories': 'calories_consumed',
+    'total_protein': 'protein_consumed',
+    'total_carbs': 'carbs_consumed',
+    'total_fat': 'fat_consumed',
+    'total_sugars': 'sugars_consumed',
+    'total_fiber': 'fiber_consumed',
+}
+
+
+def archive_cutoff():
+    """
+    Entries logged before this date belong in the archive.
+    """
+    return timezone.localdate() - timedelta(days=settings.FOOD_LOG_ARCHIVE_AFTER_DAYS)
+
+
+def pack_entries(entries):
+    return zlib.compress(FastJSONRenderer().render(list(entries)), 9)
+
+
+def unpack_entries(data):
+    return json.loads(zlib.decompress(data)) if data else []
+
+
+def _entry_order(entry):
+    return entry['log_date'], entry['created_at']
+
+
+def _archive_day(user_id, log_date, entries):
+    """
+    Adds serialized entries to the user's archived day, merged by id so a re-run after a crash
+    doesn't count anything twice.
+    """
+    with transaction.atomic():
+        day, _ = ArchivedFoodLogDay.objects.select_for_update().get_or_create(user_id=user_id, log_date=log_date)
+        merged = {entry['id']: entry for entry in unpack_entries(day.entries)}
+        merged.update((entry['id'], entry) for entry in entries)
+
+        for total, field in TOTAL_FIELDS.items():
+            setattr(day, total, sum((Decimal(str(entry[field])) for entry in merged.values()), Decimal(0)))
+        day.entry_count = len(merged)
+        day.entries = pack_entries(sorted(merged.values(), key=_entry_order, reverse=True))
+        day.save()
+
+
+def archive_batch(alias, batch_size):
+    """
+    Moves the entries of up to batch_size old user-days on one shard into the archive.
+    Returns (user-days done, entries archived).
+    """
+    days = list(
+        FoodLogEntry.objects.using(alias).filter(log_date__lt=archive_cutoff())
+        .order_by().values_list('user_id', 'log_date').distinct()[:batch_size]
+    )
+    users = get_user_model().objects.in_bulk({user_id for user_id, _ in days})
+
+    archived_days, archived_entries = 0, 0
+    for user_id, log_date in days:
+        user = users.get(user_id)
+        if user is None:
+            # Left behind by a deleted account, nothing to keep. Deleted rather than skipped, or the
+            # same days would come back first in every batch
+            with muted_signals():
+                FoodLogEntry.objects.using(alias).filter(user_id=user_id, log_date=log_date).delete()
+            archived_days += 1
+            continue
+        with transaction.atomic(using=alias), muted_signals():
+            entries = list(
+                FoodLogEntry.objects.using(alias).select_for_update()
+                .filter(user_id=user_id, log_date=log_date).prefetch_related('food_item')
+            )
+            for entry in entries:
+                entry.user = user
+            _archive_day(user_id, log_date, FoodLogEntrySerializer(entries, many=True).data)
+            FoodLogEntry.objects.using(alias).filter(pk__in=[entry.pk for entry in entries]).delete()
+        archived_days += 1
+        archived_entries += len(entries)
+    return archived_days, archived_entries
+
+
+def archived_days(user, log_date=None):
+    """
+    The user's archived days, or None when there is nothing archived to look at.
+    """
+    if log_date is not None and log_date >= archive_cutoff():
+        # Recent days are never archived, skip the query
+        return None
+    days = ArchivedFoodLogDay.objects.filter(user=user)
+    if log_date is not None:
+        days = days.filter(log_date=log_date)
+    return days
+
+
+def merge_archived_entries(user, entries, log_date=None):
+    """
+    Adds the user's archived entries (for one date, or all of them) to serialized live entries,
+    in the list's '-log_date', '-created_at' order.
+    """
+    days = archived_days(user, log_date)
+    if days is None:
+        return entries
+    archived = [entry for data in days.values_list('entries', flat=True) for entry in unpack_entries(data)]
+    if not archived:
+        return entries
+    for entry in archived:
+        # Stored at archive time, the user may have been renamed since
+        entry['user_name'] = user.name
+    return sorted([*entries, *archived], key=_entry_order, reverse=True)
+
+
+def archived_totals(user, log_date):
+    """
+    The archived totals of one day, as a dict like TOTAL_FIELDS, or None if nothing was archived.
+    """
+    days = archived_days(user, log_date)
+    if days is None:
+        return None
+    return days.values(*TOTAL_FIELDS).first()
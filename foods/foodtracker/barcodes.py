@@ -0,0 +1,89 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from .models import FoodItem
+from .open_food_facts import get_food_details_from_open_food_facts
+from .serializer import FoodItemSerializer
+
+# Cached for barcodes Open Food Facts doesn't know, so repeated scans never reach the network
+MISSING = 'missing'
+# Remote lookup failed (network error, bad response), not the same as a missing product
+FAILED = object()
+
+FOOD_ITEM_FIELDS = ('name', 'calories', 'protein', 'carbs', 'fat', 'sugars', 'fiber', 'unit')
+
+
+def barcode_cache_key(code):
+    return f"barcode_{code}"
+
+
+def _save_food_item(code, details):
+    """
+    Stores a product found remotely as a FoodItem, so it can be logged and is found locally next time.
+    Returns None if it can't be stored, e.g. another food item already has its name.
+    """
+    try:
+        with transaction.atomic():
+            return FoodItem.objects.create(external_api_id=code, **{
+                field: details[field] for field in FOOD_ITEM_FIELDS if details.get(field) is not None
+            })
+    except (DatabaseError, ValidationError):
+        return None
+
+
+def _fetch_remote(code):
+    import requests
+    try:
+        return get_food_details_from_open_food_facts(code, raise_on_error=True)
+    except (requests.exceptions.RequestException, ValueError):
+        return FAILED
+
+
+def lookup_barcodes(codes):
+    """
+    Resolves barcodes from FoodItem.external_api_id, then the cache, then Open Food Facts.
+    Returns (found {code: food data}, missing codes, codes whose remote lookup failed).
+    """
+    codes = list(dict.fromkeys(codes))
+    found = {}
+
+    # 1. Food items we already have, one indexed query
+    for food_item in FoodItem.objects.filter(external_api_id__in=codes):
+        found.setdefault(food_item.external_api_id, FoodItemSerializer(food_item).data)
+    remaining = [code for code in codes if code not in found]
+
+    # 2. Cached remote results, including known misses, in one round trip
+    cached = cache.get_many([barcode_cache_key(code) for code in remaining])
+    missing = [code for code in remaining if cached.get(barcode_cache_key(code)) == MISSING]
+    for code in remaining:
+        data = cached.get(barcode_cache_key(code))
+        if data is not None and data != MISSING:
+            found[code] = data
+    remaining = [code for code in remaining if barcode_cache_key(code) not in cached]
+    if not remaining:
+        return found, missing, []
+
+    # 3. Open Food Facts, a few lookups at a time (the threads only do HTTP, no database access)
+    with ThreadPoolExecutor(max_workers=min(len(remaining), settings.BARCODE_LOOKUP_WORKERS)) as executor:
+        results = dict(zip(remaining, executor.map(_fetch_remote, remaining)))
+
+    errors, misses, unsaved = [], {}, {}
+    for code, details in results.items():
+        if details is FAILED:
+            # Don't cache it, the next scan tries again
+            errors.append(code)
+        elif details is None or not details.get('name'):
+            missing.append(code)
+            misses[barcode_cache_key(code)] = MISSING
+        else:
+            food_item = _save_food_item(code, details)
+            if food_item is not None:
+                found[code] = FoodItemSerializer(food_item).data
+            else:
+                # Its name is taken by another food item, keep the product in the cache instead
+                found[code] = unsaved[barcode_cache_key(code)] = {**details, 'external_api_id': code}
+    cache.set_many(misses, settings.BARCODE_MISS_CACHE_TIMEOUT)
+    cache.set_many(unsaved, settings.BARCODE_CACHE_TIMEOUT)
+    return found, missing, errors
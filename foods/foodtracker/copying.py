@@ -0,0 +1,36 @@
+from django.db import transaction
+from .models import FoodLogEntry
+from .quick_add import record_logged_foods
+from .sharding import get_user_shard
+from .versioning import bump_log_versions
+
+# Copied as-is: the nutrients were computed when the source entry was logged, no food lookups needed
+COPIED_FIELDS = (
+    'food_item', 'food_name', 'quantity', 'quantity_unit',
+    'calories_consumed', 'protein_consumed', 'carbs_consumed', 'fat_consumed', 'sugars_consumed', 'fiber_consumed',
+)
+
+
+def copy_entries(user, entries, target_dates, batch_size=500):
+    """
+    Logs a copy of every entry on every target date with batched bulk_create() on the user's shard.
+    bulk_create() sends no signals, so the summary caches and quick-add are updated here.
+    Returns the new entries.
+    """
+    copies = [
+        FoodLogEntry(user=user, log_date=log_date, **{
+            field: getattr(entry, field) for field in COPIED_FIELDS
+        })
+        for log_date in target_dates
+        for entry in entries
+    ]
+    if not copies:
+        return []
+
+    shard = get_user_shard(user.pk, for_write=True)
+    with transaction.atomic(using=shard):
+        copies = FoodLogEntry.objects.using(shard).bulk_create(copies, batch_size=batch_size)
+
+    bump_log_versions(user.pk, {str(log_date) for log_date in target_dates})
+    record_logged_foods(user.pk, copies)
+    return copies
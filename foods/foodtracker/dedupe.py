@@ -0,0 +1,189 @@
+"""
+Merges near-duplicate food items of the shared catalog ("Greek Yogurt", "greek yogurt (2)",
+"Yogurt, Greek") into one canonical item.
+
+Items are only compared within a block: those whose normalized names hash the same (case, accents,
+punctuation, word order and collision suffixes like "(2)" ignored). Within a block, an item joins the
+cluster of the first canonical item whose nutrient vector is close to its own (every per-100g value
+known on both sides within DEDUPE_NUTRIENT_TOLERANCE), so "Cola" and "Cola zero" stay apart and
+no pair outside a block is ever compared.
+"""
+import hashlib
+import re
+import unicodedata
+from decimal import Decimal
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .fuzzy import words
+from .models import FoodItem, FoodLogEntry, FrequentFood, RecipeIngredient
+from .quick_add import food_key
+from .recipes import NUTRIENT_FIELDS, update_recipes
+from .versioning import bump_log_versions
+
+# "Apple (2)", "Apple #3", "Apple - copy": suffixes added to get past the unique name
+COLLISION_SUFFIX_RE = re.compile(r'\s*(\(\d+\)|#\d+|-\s*copy)\s*$', re.IGNORECASE)
+
+
+def normalize_name(name):
+    name = COLLISION_SUFFIX_RE.sub('', name)
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    return ' '.join(sorted(words(name)))
+
+
+def block_key(name):
+    return hashlib.blake2b(normalize_name(name).encode(), digest_size=8).digest()
+
+
+def _completeness(item):
+    # Canonical items: linked to Open Food Facts, most nutrients known, oldest
+    return (item['external_api_id'] is None, -sum(item[field] is not None for field in NUTRIENT_FIELDS), item['id'])
+
+
+def _close(a, b, tolerance):
+    if a['calories'] is None or b['calories'] is None:
+        return False
+    for field in NUTRIENT_FIELDS:
+        x, y = a[field], b[field]
+        if x is None or y is None:
+            continue
+        # Relative difference, with 1 g / 1 kcal of slack for small values
+        if abs(x - y) > tolerance * max(abs(x), abs(y), 1):
+            return False
+    return True
+
+
+def find_duplicates(tolerance=None):
+    """
+    {canonical id: [duplicate ids]} for the shared catalog (not users' own foods or recipes).
+    One streaming pass over the catalog, then only items sharing a block are compared.
+    """
+    tolerance = Decimal(str(settings.DEDUPE_NUTRIENT_TOLERANCE if tolerance is None else tolerance))
+    blocks = {}
+    items = (
+        FoodItem.objects.filter(created_by__isnull=True, is_recipe=False).order_by()
+        .values('id', 'name', 'external_api_id', *NUTRIENT_FIELDS).iterator(chunk_size=10000)
+    )
+    for item in items:
+        if normalize_name(item['name']):
+            blocks.setdefault(block_key(item['name']), []).append(item)
+
+    duplicates = {}
+    for block in blocks.values():
+        if len(block) < 2:
+            continue
+        canonicals = []
+        for item in sorted(block, key=_completeness):
+            for canonical in canonicals:
+                if _close(canonical, item, tolerance):
+                    duplicates.setdefault(canonical['id'], []).append(item['id'])
+                    break
+            else:
+                canonicals.append(item)
+    return duplicates
+
+
+def _repoint_log_entries(canonical_id, duplicate_ids):
+    """
+    Points every shard's log entries at the canonical item, one UPDATE per shard. The entries keep
+    their name and consumed nutrients, only their food_item id (part of cached and synced payloads) changes.
+    """
+    repointed = 0
+    for alias in settings.FOOD_LOG_SHARDS:
+        entries = FoodLogEntry.objects.using(alias).filter(food_item_id__in=duplicate_ids)
+        changed = {}
+        for user_id, log_date in entries.order_by().values_list('user_id', 'log_date').distinct():
+            changed.setdefault(user_id, set()).add(log_date)
+        if not changed:
+            continue
+        repointed += entries.update(food_item_id=canonical_id, updated_at=timezone.now())
+        for user_id, log_dates in changed.items():
+            bump_log_versions(user_id, log_dates)
+    return repointed
+
+
+def _repoint_recipe_ingredients(canonical_id, duplicate_ids):
+    """
+    Recipes using a duplicate use the canonical item instead; a recipe with both gets one row with
+    the quantities added up. Returns the ids of the recipes to recompute.
+    """
+    rows = list(RecipeIngredient.objects.filter(ingredient_id__in=duplicate_ids))
+    if not rows:
+        return set()
+    existing = {
+        row.recipe_id: row
+        for row in RecipeIngredient.objects.filter(ingredient_id=canonical_id, recipe_id__in={row.recipe_id for row in rows})
+    }
+    for row in rows:
+        target = existing.get(row.recipe_id)
+        if target is None:
+            row.ingredient_id = canonical_id
+            row.save(update_fields=['ingredient'])
+            existing[row.recipe_id] = row
+        else:
+            RecipeIngredient.objects.filter(pk=target.pk).update(quantity=F('quantity') + row.quantity)
+            row.delete()
+    return set(existing)
+
+
+def _repoint_frequent_foods(canonical_id, duplicate_ids):
+    """
+    Quick-add rows of a duplicate become the canonical item's, counts added up where the user has both.
+    """
+    key = food_key(canonical_id, '')
+    for food in FrequentFood.objects.filter(food_item_id__in=duplicate_ids).order_by('last_logged_at'):
+        updated = FrequentFood.objects.filter(user_id=food.user_id, food_key=key).update(
+            log_count=F('log_count') + food.log_count,
+        )
+        if updated:
+            food.delete()
+        else:
+            food.food_item_id = canonical_id
+            food.food_key = key
+            food.save(update_fields=['food_item', 'food_key'])
+
+
+def merge_duplicates(canonical_id, duplicate_ids):
+    """
+    Moves everything referencing the duplicates to the canonical item and deletes them.
+    Returns the number of log entries repointed.
+    """
+    # Log entries live on the shards, outside the transaction below. They are moved first, so deleting
+    # the duplicates never touches them; after a crash in between, a re-run finishes the merge.
+    repointed = _repoint_log_entries(canonical_id, duplicate_ids)
+    with transaction.atomic():
+        # The canonical item keeps a barcode if only a duplicate had one
+        code = (
+            FoodItem.objects.filter(pk__in=duplicate_ids, external_api_id__isnull=False)
+            .values_list('external_api_id', flat=True).first()
+        )
+        if code:
+            FoodItem.objects.filter(pk=canonical_id, external_api_id__isnull=True).update(external_api_id=code)
+        recipe_ids = _repoint_recipe_ingredients(canonical_id, duplicate_ids)
+        _repoint_frequent_foods(canonical_id, duplicate_ids)
+        FoodItem.objects.filter(pk__in=duplicate_ids).delete()
+    if recipe_ids:
+        update_recipes(recipe_ids)
+    return repointed
+
+
+def fuzzy_postings(food_ids, batch_size=1000):
+    """
+    Entries the fuzzy search index (fuzzy.py) holds for these items, one per distinct word of their names.
+    """
+    food_ids = list(food_ids)
+    total = 0
+    for start in range(0, len(food_ids), batch_size):
+        names = FoodItem.objects.filter(pk__in=food_ids[start:start + batch_size]).values_list('name', flat=True)
+        total += sum(len(set(words(name))) for name in names)
+    return total
+
+
+def food_item_index_count():
+    """
+    Indexes on the FoodItem table, each of which loses an entry per merged item.
+    """
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, FoodItem._meta.db_table)
+    return sum(1 for constraint in constraints.values() if constraint['index'] or constraint['unique'])
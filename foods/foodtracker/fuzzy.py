@@ -0,0 +1,201 @@
+"""
+Typo-tolerant search over the shared food catalog (FoodItem names), used by search_foods() when Open Food
+Facts finds nothing, e.g. for misspelled queries ("brocoli", "yoghurt").
+
+The index is word level and kept in memory by each worker:
+
+- every distinct word of the names, with its trigrams ("$brocoli$" -> "$br", "bro", ..., "li$"),
+- trigram -> ids of the words containing it,
+- word -> ids of the food items whose name contains it, those with the fewest words first.
+
+A query word is matched to the words that share enough trigrams with it (Dice coefficient of at least
+FUZZY_SEARCH_MIN_SIMILARITY, length within 2 characters). Names are then ranked by how well their words
+cover the query's. Only ids are kept, names are read from the database for the final results.
+
+Time is bounded: very common trigrams are skipped when rarer ones exist, and only the best few
+corrections per word and the first FUZZY_MAX_POSTINGS items per word are looked at. Those are the
+items with the shortest names, the closest to the word itself ("Apple" and "Apple juice" before
+"Apple and cinnamon crumble"), whatever their age.
+
+Footprint (benchmarks/bench_fuzzy_search.py, 1M synthetic names of 2-4 words, ~100k distinct words):
+~60 MB per worker, about 63 bytes per name, most of it the 8-byte ids in the word postings and the
+vocabulary's strings. Building takes ~11 s; queries take under 3 ms.
+"""
+import re
+import threading
+import time
+from array import array
+from django.conf import settings
+from django.db import connections
+from .models import FoodItem
+
+WORD_RE = re.compile(r'[^\W\d_]{2,}|\d+')
+
+# Trigrams found in more words than this are only used when a word has no rarer ones
+COMMON_TRIGRAM_WORDS = 2000
+CORRECTIONS_PER_WORD = 5
+# Postings are ordered by the number of words in the name, packed above the id while building
+ID_BITS = 48
+ID_MASK = (1 << ID_BITS) - 1
+MAX_NAME_WORDS = 255
+
+_index = None
+_index_lock = threading.Lock()
+_rebuilding = False
+
+
+def words(text):
+    return WORD_RE.findall(text.lower())
+
+
+def trigrams(word):
+    padded = f"${word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FuzzyIndex:
+    def __init__(self, names):
+        """
+        names: iterable of (food item id, name).
+        """
+        word_ids = {}
+        items_by_word = []
+        for food_id, name in names:
+            name_words = set(words(name))
+            # Sort key in the high bits, so the postings can be ordered in place
+            key = min(len(name_words), MAX_NAME_WORDS) << ID_BITS | food_id
+            for word in name_words:
+                word_id = word_ids.get(word)
+                if word_id is None:
+                    word_id = word_ids[word] = len(items_by_word)
+                    items_by_word.append(array('q'))
+                items_by_word[word_id].append(key)
+        for word_id, keys in enumerate(items_by_word):
+            items_by_word[word_id] = array('q', (key & ID_MASK for key in sorted(keys)))
+
+        words_by_trigram = {}
+        for word, word_id in word_ids.items():
+            for trigram in trigrams(word):
+                words_by_trigram.setdefault(trigram, array('l')).append(word_id)
+
+        self.word_ids = word_ids
+        self.vocabulary = list(word_ids)  # word id -> word
+        self.items_by_word = items_by_word
+        self.words_by_trigram = words_by_trigram
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def corrections(self, word, min_similarity):
+        """
+        [(similarity, word id)] of the indexed words closest to `word`, best first.
+        """
+        word_id = self.word_ids.get(word)
+        if word_id is not None:
+            return [(1.0, word_id)]
+
+        query_trigrams = trigrams(word)
+        postings = sorted(
+            (self.words_by_trigram[trigram] for trigram in query_trigrams if trigram in self.words_by_trigram),
+            key=len,
+        )
+        rare = [word_ids for word_ids in postings if len(word_ids) <= COMMON_TRIGRAM_WORDS]
+        # Two shared trigrams are needed for any useful similarity, fall back to common ones otherwise
+        postings = rare if len(rare) >= 2 else postings[:2]
+
+        shared = {}
+        for word_ids in postings:
+            for word_id in word_ids:
+                shared[word_id] = shared.get(word_id, 0) + 1
+
+        found = []
+        for word_id, count in shared.items():
+            candidate = self.vocabulary[word_id]
+            if abs(len(candidate) - len(word)) > 2:
+                continue
+            # A padded word has as many trigrams as letters
+            similarity = 2 * count / (len(query_trigrams) + len(candidate))
+            if similarity >= min_similarity:
+                found.append((similarity, word_id))
+        found.sort(reverse=True)
+        return found[:CORRECTIONS_PER_WORD]
+
+    def search(self, query, limit, min_similarity, max_postings):
+        """
+        [(score, food item id)] best first, score being the average similarity of the query's words
+        to their best match in the name.
+        """
+        query_words = list(dict.fromkeys(words(query)))
+        if not query_words:
+            return []
+
+        scores = {}
+        for position, word in enumerate(query_words):
+            for similarity, word_id in self.corrections(word, min_similarity):
+                for food_id in self.items_by_word[word_id][:max_postings]:
+                    best = scores.setdefault(food_id, [0.0] * len(query_words))
+                    if similarity > best[position]:
+                        best[position] = similarity
+
+        ranked = [(sum(best) / len(query_words), food_id) for food_id, best in scores.items()]
+        ranked = [(score, food_id) for score, food_id in ranked if score >= min_similarity]
+        # Stable: equal scores keep the postings' order, shortest names first
+        ranked.sort(key=lambda item: -item[0])
+        return ranked[:limit]
+
+
+def build_fuzzy_index():
+    """
+    Builds the index from the shared catalog (not users' own foods and recipes), streaming the names.
+    """
+    names = (
+        FoodItem.objects.filter(created_by__isnull=True).order_by()
+        .values_list('id', 'name').iterator(chunk_size=10000)
+    )
+    return FuzzyIndex(names)
+
+
+def _rebuild():
+    global _index, _rebuilding
+    try:
+        _index = build_fuzzy_index()
+    finally:
+        _rebuilding = False
+        connections.close_all()
+
+
+def start_fuzzy_index_build():
+    """
+    Builds (or rebuilds) this worker's index in a background thread, unless a build is already running.
+    """
+    global _rebuilding
+    with _index_lock:
+        if _rebuilding:
+            return
+        _rebuilding = True
+    threading.Thread(target=_rebuild, name='fuzzy-index', daemon=True).start()
+
+
+def get_fuzzy_index():
+    """
+    This worker's index, or None until its first build is done. Built in the background at startup
+    (or on first use), then rebuilt every FUZZY_INDEX_MAX_AGE seconds to pick up new food items,
+    the old one answering meanwhile. A request never waits for a build.
+    """
+    if _index is None or time.monotonic() - _index.built_at > settings.FUZZY_INDEX_MAX_AGE:
+        start_fuzzy_index_build()
+    return _index
+
+
+def fuzzy_food_search(query, limit=None):
+    """
+    FoodItem matches of a possibly misspelled query, best first; none while the index is being built.
+    """
+    index = get_fuzzy_index()
+    if index is None:
+        return []
+    limit = limit or settings.FUZZY_SEARCH_LIMIT
+    ranked = index.search(query, limit, settings.FUZZY_SEARCH_MIN_SIMILARITY, settings.FUZZY_MAX_POSTINGS)
+    food_items = FoodItem.objects.in_bulk([food_id for _, food_id in ranked])
+    return [food_items[food_id] for _, food_id in ranked if food_id in food_items]
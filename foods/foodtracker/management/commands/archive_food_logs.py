@@ -0,0 +1,36 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from foodtracker.archive import archive_batch, archive_cutoff
+
+
+class Command(BaseCommand):
+    help = "Moves food log entries older than FOOD_LOG_ARCHIVE_AFTER_DAYS into the compressed per-day archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help="User-days archived per batch.")
+        parser.add_argument('--loop', action='store_true', help="Keep archiving as days age instead of exiting when done.")
+        parser.add_argument('--interval', type=float, default=3600.0, help="Seconds to sleep between runs in --loop mode.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total_days, total_entries = 0, 0
+
+        while True:
+            full = False
+            for alias in settings.FOOD_LOG_SHARDS:
+                days, entries = archive_batch(alias, batch_size)
+                total_days += days
+                total_entries += entries
+                if days:
+                    self.stdout.write(f"{alias}: archived {entries} entries from {days} days before {archive_cutoff()}")
+                full = full or days == batch_size
+
+            # A full batch means there is probably more waiting, go again right away
+            if full:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Archived {total_entries} entries from {total_days} days."))
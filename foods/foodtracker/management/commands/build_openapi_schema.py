@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from foods.schema import build_schema
+
+
+class Command(BaseCommand):
+    help = "Generates the OpenAPI schema served to Swagger UI / ReDoc. Run it on every deploy."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Where to write it (defaults to OPENAPI_SCHEMA_FILE).")
+
+    def handle(self, *args, **options):
+        path = build_schema(options['output'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {path} ({path.stat().st_size} bytes)."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from foodtracker.dedupe import find_duplicates, food_item_index_count, fuzzy_postings, merge_duplicates
+from foodtracker.models import FoodItem
+
+
+class Command(BaseCommand):
+    help = (
+        "Merges near-duplicate food items of the shared catalog (same normalized name, close nutrients) into "
+        "one canonical item, repointing log entries, recipes and quick-add foods, and reports how much the "
+        "catalog and its indexes shrank."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report the duplicates found.")
+        parser.add_argument('--tolerance', type=float, default=None, help="Largest relative nutrient difference (defaults to DEDUPE_NUTRIENT_TOLERANCE).")
+
+    def handle(self, *args, **options):
+        before = FoodItem.objects.count()
+        duplicates = find_duplicates(options['tolerance'])
+        duplicate_ids = [food_id for ids in duplicates.values() for food_id in ids]
+        postings = fuzzy_postings(duplicate_ids)
+        self.stdout.write(f"{len(duplicates)} groups, {len(duplicate_ids)} duplicates among {before} food items.")
+
+        if not options['dry_run']:
+            repointed = 0
+            for done, (canonical_id, ids) in enumerate(duplicates.items(), start=1):
+                repointed += merge_duplicates(canonical_id, ids)
+                if done % 1000 == 0:
+                    self.stdout.write(f"Merged {done} of {len(duplicates)} groups")
+            self.stdout.write(f"Repointed {repointed} log entries.")
+
+        after = before - len(duplicate_ids)
+        verb = "Would shrink" if options['dry_run'] else "Shrank"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} the catalog from {before} to {after} food items ({len(duplicate_ids) / max(before, 1):.1%}), "
+            f"dropping {len(duplicate_ids) * food_item_index_count()} database index entries "
+            f"and {postings} fuzzy search index entries."
+        ))
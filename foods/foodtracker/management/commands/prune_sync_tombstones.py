@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from foodtracker.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Deletes the tombstones of food log entries deleted more than SYNC_TOMBSTONE_DAYS ago, on every shard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Tombstones deleted per batch.")
+
+    def handle(self, *args, **options):
+        total = 0
+        for alias in settings.FOOD_LOG_SHARDS:
+            pruned = 0
+            while True:
+                deleted = prune_tombstones(alias, options['batch_size'])
+                pruned += deleted
+                if deleted < options['batch_size']:
+                    break
+            if pruned:
+                self.stdout.write(f"{alias}: {pruned} tombstones")
+            total += pruned
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Pruned {total} tombstones older than {settings.SYNC_TOMBSTONE_DAYS} days."))
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from foodtracker.models import FoodLogEntry
+from foodtracker.sharding import get_user_shard, move_user_entries, pin_existing_users
+
+
+class Command(BaseCommand):
+    help = "Moves users' food log entries between FOOD_LOG_SHARDS and reports the rows per shard."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, nargs='+', default=[], help="Ids of the users to move.")
+        parser.add_argument('--to', help="Shard alias to move them to, e.g. food_logs_1.")
+        parser.add_argument(
+            '--pin-existing', action='store_true',
+            help="Keep users that already have entries on 'default' there. Run once when enabling shards.",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--allow-local-cache', action='store_true',
+            help="Move users without REDIS_URL, e.g. when no web server is running.",
+        )
+
+    def handle(self, *args, **options):
+        if options['pin_existing']:
+            pinned = pin_existing_users()
+            self.stdout.write(self.style.SUCCESS(f"Pinned {pinned} existing users to 'default'."))
+
+        if options['user']:
+            target = options['to']
+            if target not in settings.FOOD_LOG_SHARDS:
+                raise CommandError(f"--to must be one of {', '.join(settings.FOOD_LOG_SHARDS)}")
+            if not settings.REDIS_URL:
+                # Web workers only learn about the move when their cached shard alias expires,
+                # until then they read and write the old shard
+                if not options['allow_local_cache']:
+                    raise CommandError(
+                        "Moving users needs a shared cache (REDIS_URL), so web workers switch shards right away. "
+                        "Use --allow-local-cache if no web server is running."
+                    )
+                self.stderr.write(self.style.WARNING(
+                    "No REDIS_URL: running web workers keep using the old shard for up to "
+                    f"{settings.FOOD_LOG_SHARD_CACHE_TIMEOUT} seconds."
+                ))
+            for user_id in options['user']:
+                source = get_user_shard(user_id)
+                moved = move_user_entries(user_id, target, batch_size=options['batch_size'])
+                self.stdout.write(f"User {user_id}: {source} -> {target}, {moved} entries")
+
+        for alias in settings.FOOD_LOG_SHARDS:
+            self.stdout.write(f"{alias}: {FoodLogEntry.objects.using(alias).count()} entries")
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from foodtracker.models import FoodLogEntry
+from foodtracker.quick_add import rebuild_frequent_foods
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the quick-add foods of every user (or the given ones) from their food log history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, nargs='+', default=[], help="Ids of the users to rebuild.")
+
+    def handle(self, *args, **options):
+        users, foods = 0, 0
+        for alias in settings.FOOD_LOG_SHARDS:
+            user_ids = options['user'] or (
+                FoodLogEntry.objects.using(alias).order_by().values_list('user_id', flat=True).distinct()
+            )
+            for user_id in user_ids:
+                entries = (
+                    FoodLogEntry.objects.using(alias).filter(user_id=user_id)
+                    .only('food_item_id', 'food_name', 'quantity', 'quantity_unit', 'created_at')
+                    .order_by('created_at')
+                )
+                if options['user'] and not entries.exists():
+                    continue
+                count = rebuild_frequent_foods(user_id, entries.iterator(chunk_size=2000))
+                self.stdout.write(f"User {user_id}: {count} foods")
+                users += 1
+                foods += count
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt quick-add foods for {users} users ({foods} foods)."))
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from foodtracker.warmup import warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        "Preloads popular food searches and today's summaries of recently active users into the cache. "
+        "Run it after a deploy; with a per-process cache (LocMemCache) use CACHE_WARMUP_ON_STARTUP instead."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--searches', type=int, default=settings.CACHE_WARMUP_SEARCHES, help="How many popular searches to preload.")
+        parser.add_argument('--users', type=int, default=settings.CACHE_WARMUP_USERS, help="How many active users' summaries to preload.")
+        parser.add_argument('--workers', type=int, default=settings.CACHE_WARMUP_WORKERS, help="How many to preload at a time.")
+        parser.add_argument('--seconds', type=int, default=settings.CACHE_WARMUP_SECONDS, help="Time budget, nothing new is started after it.")
+
+    def handle(self, *args, **options):
+        counts = warm_caches(options['searches'], options['users'], options['workers'], options['seconds'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Warmed {counts['searches']} searches and {counts['summaries']} summaries"
+            f" ({counts['skipped']} skipped, out of time)."
+        ))
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SHARD_ID_SPACING = 10 ** 12
+
+
+def seed_shard_id_range(apps, schema_editor):
+    """
+    Starts FoodLogEntry ids on shard N at N * SHARD_ID_SPACING, so ids are unique across shards
+    and entries can keep them when the rebalance_food_logs command moves them to another shard.
+    """
+    connection = schema_editor.connection
+    if connection.alias not in settings.FOOD_LOG_SHARDS:
+        return
+    start = settings.FOOD_LOG_SHARDS.index(connection.alias) * SHARD_ID_SPACING
+    if not start:
+        return
+    table = apps.get_model('foodtracker', 'FoodLogEntry')._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute("DELETE FROM sqlite_sequence WHERE name = %s", [table])
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)", [table, start])
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT setval(pg_get_serial_sequence(%s, 'id'), %s)", [table, start])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0004_rename_carps_fooditem_carbs'),
+        ('users', '0003_user_avatar_pending_user_avatar_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserShard',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='food_log_shard', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('alias', models.CharField(max_length=100, verbose_name='Database Alias')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'User Shard',
+                'verbose_name_plural': 'User Shards',
+            },
+        ),
+        migrations.AlterField(
+            model_name='foodlogentry',
+            name='food_item',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='logged_entries', to='foodtracker.fooditem', verbose_name='Food Item'),
+        ),
+        migrations.AlterField(
+            model_name='foodlogentry',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='food_logs', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.RunPython(seed_shard_id_range, migrations.RunPython.noop),
+    ]
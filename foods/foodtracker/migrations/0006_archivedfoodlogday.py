@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0005_usershard_alter_foodlogentry_food_item_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedFoodLogDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('log_date', models.DateField(verbose_name='Log Date')),
+                ('entry_count', models.PositiveIntegerField(default=0, verbose_name='Entries')),
+                ('total_calories', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Total Calories')),
+                ('total_protein', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Total Protein')),
+                ('total_carbs', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Total Carbohydrates')),
+                ('total_fat', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Total Fat')),
+                ('total_sugars', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Total Sugars')),
+                ('total_fiber', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Total Fiber')),
+                ('entries', models.BinaryField(default=bytes, verbose_name='Compressed Entries')),
+                ('archived_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_food_log_days', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Archived Food Log Day',
+                'verbose_name_plural': 'Archived Food Log Days',
+                'ordering': ['-log_date'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'log_date'), name='unique_archived_food_log_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0006_archivedfoodlogday'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FrequentFood',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('food_key', models.CharField(max_length=300)),
+                ('food_name', models.CharField(max_length=255, verbose_name='Food Name')),
+                ('last_quantity', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Last Quantity')),
+                ('last_quantity_unit', models.CharField(max_length=50, verbose_name='Last Quantity Unit')),
+                ('log_count', models.PositiveIntegerField(default=0, verbose_name='Times Logged')),
+                ('last_logged_at', models.DateTimeField(verbose_name='Last Logged At')),
+                ('food_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='foodtracker.fooditem', verbose_name='Food Item')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='frequent_foods', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Frequent Food',
+                'verbose_name_plural': 'Frequent Foods',
+                'indexes': [models.Index(fields=['user', '-last_logged_at'], name='foodtracker_user_id_062a2b_idx'), models.Index(fields=['user', '-log_count', '-last_logged_at'], name='foodtracker_user_id_8f79fb_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'food_key'), name='unique_frequent_food')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0007_frequentfood'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='fooditem',
+            name='external_api_id',
+            field=models.CharField(blank=True, db_index=True, help_text='ID from external food database (e.g., Open Food Facts)', max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0008_alter_fooditem_external_api_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fooditem',
+            name='is_recipe',
+            field=models.BooleanField(default=False, verbose_name='Is Recipe'),
+        ),
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Quantity (g)')),
+                ('ingredient', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='used_in', to='foodtracker.fooditem', verbose_name='Ingredient')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ingredients', to='foodtracker.fooditem', verbose_name='Recipe')),
+            ],
+            options={
+                'verbose_name': 'Recipe Ingredient',
+                'verbose_name_plural': 'Recipe Ingredients',
+                'constraints': [models.UniqueConstraint(fields=('recipe', 'ingredient'), name='unique_recipe_ingredient')],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0009_fooditem_is_recipe_recipeingredient'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, unique=True, verbose_name='Query')),
+                ('search_count', models.PositiveIntegerField(default=0, verbose_name='Searches')),
+                ('last_searched_at', models.DateTimeField(verbose_name='Last Searched At')),
+            ],
+            options={
+                'verbose_name': 'Popular Search',
+                'verbose_name_plural': 'Popular Searches',
+                'indexes': [models.Index(fields=['-search_count', '-last_searched_at'], name='foodtracker_search__72e96a_idx')],
+            },
+        ),
+    ]
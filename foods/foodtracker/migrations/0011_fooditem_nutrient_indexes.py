@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0010_popularsearch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['calories'], name='foodtracker_calorie_6cc0ef_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['protein'], name='foodtracker_protein_619c76_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['carbs'], name='foodtracker_carbs_87d6ea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['fat'], name='foodtracker_fat_b5f418_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['sugars'], name='foodtracker_sugars_36d0f4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fooditem',
+            index=models.Index(fields=['fiber'], name='foodtracker_fiber_fbd5ee_idx'),
+        ),
+    ]
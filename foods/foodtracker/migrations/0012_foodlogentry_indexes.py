@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0011_fooditem_nutrient_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foodlogentry',
+            index=models.Index(fields=['user', '-log_date'], name='foodtracker_user_id_e5f109_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodlogentry',
+            index=models.Index(fields=['-log_date', '-created_at'], name='foodtracker_log_dat_e5aea5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodlogentry',
+            index=models.Index(fields=['food_name'], name='foodtracker_food_na_19fdc6_idx'),
+        ),
+    ]
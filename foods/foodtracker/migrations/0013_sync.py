@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodtracker', '0012_foodlogentry_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeletedFoodLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_id', models.BigIntegerField(verbose_name='Entry ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='Deleted At')),
+            ],
+            options={
+                'verbose_name': 'Deleted Food Log Entry',
+                'verbose_name_plural': 'Deleted Food Log Entries',
+            },
+        ),
+        migrations.AddField(
+            model_name='foodlogentry',
+            name='client_id',
+            field=models.CharField(blank=True, max_length=64, null=True, verbose_name='Client ID'),
+        ),
+        migrations.AddIndex(
+            model_name='foodlogentry',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='foodtracker_user_id_ef5282_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='foodlogentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id__isnull', False)), fields=('user', 'client_id'), name='unique_food_log_client_id'),
+        ),
+        migrations.AddField(
+            model_name='deletedfoodlogentry',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddIndex(
+            model_name='deletedfoodlogentry',
+            index=models.Index(fields=['user', 'deleted_at', 'id'], name='foodtracker_user_id_e326cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='deletedfoodlogentry',
+            index=models.Index(fields=['deleted_at'], name='foodtracker_deleted_d3e1ca_idx'),
+        ),
+    ]
@@ -15,7 +15,7 @@ class FoodItem(models.Model):
     
     unit = models.CharField(_("Unit of Measurement"), max_length=50, default="g")
     
-    external_api_id = models.CharField(max_length=255, null=True, blank=True, help_text=_("ID from external food database (e.g., Open Food Facts)"))
+    external_api_id = models.CharField(max_length=255, null=True, blank=True, db_index=True, help_text=_("ID from external food database (e.g., Open Food Facts)"))
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -24,6 +24,8 @@ class FoodItem(models.Model):
         related_name='custom_food_items',
         help_text=_("User who created this custom food item (if applicable)")
     )
+    # Recipes get their per-100g nutrients computed from their ingredients (see recipes.py)
+    is_recipe = models.BooleanField(_("Is Recipe"), default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -31,17 +33,67 @@ class FoodItem(models.Model):
         verbose_name = _("Food Item")
         verbose_name_plural = _("Food Items")
         ordering = ['name']
+        # For nutrient range filters and "top by protein" ordering (see nutrient_filter.py)
+        indexes = [
+            models.Index(fields=['calories']),
+            models.Index(fields=['protein']),
+            models.Index(fields=['carbs']),
+            models.Index(fields=['fat']),
+            models.Index(fields=['sugars']),
+            models.Index(fields=['fiber']),
+        ]
 
     def __str__(self):
         return self.name
 
 
+class RecipeIngredient(models.Model):
+    recipe = models.ForeignKey(
+        FoodItem,
+        on_delete=models.CASCADE,
+        related_name='ingredients',
+        verbose_name=_("Recipe"),
+    )
+    ingredient = models.ForeignKey(
+        FoodItem,
+        on_delete=models.PROTECT,
+        related_name='used_in',
+        verbose_name=_("Ingredient"),
+    )
+    quantity = models.DecimalField(_("Quantity (g)"), max_digits=8, decimal_places=2)
+
+    class Meta:
+        verbose_name = _("Recipe Ingredient")
+        verbose_name_plural = _("Recipe Ingredients")
+        constraints = [
+            models.UniqueConstraint(fields=['recipe', 'ingredient'], name='unique_recipe_ingredient'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} g of {self.ingredient_id} in {self.recipe_id}"
+
+
+class FoodLogEntryQuerySet(models.QuerySet):
+    def for_user(self, user):
+        """
+        The user's entries, read from the database shard that holds them (or one of its replicas).
+        """
+        from .sharding import get_user_read_shard
+        alias = get_user_read_shard(user.pk)
+        queryset = self.filter(user=user)
+        # An explicit alias would bypass the replica routing
+        return queryset.using(alias) if alias else queryset
+
+
 class FoodLogEntry(models.Model):
+    # Entries may live on a different database (shard) than users and food items,
+    # so these foreign keys can't be enforced by the database.
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
         related_name='food_logs',
-        verbose_name=_("User")
+        verbose_name=_("User"),
+        db_constraint=False,
     )
     
     food_item = models.ForeignKey(
@@ -50,7 +102,8 @@ class FoodLogEntry(models.Model):
         null=True,
         blank=True,
         related_name='logged_entries',
-        verbose_name=_("Food Item")
+        verbose_name=_("Food Item"),
+        db_constraint=False,
     )
     
     food_name = models.CharField(_("Food Name"), max_length=255)
@@ -65,15 +118,42 @@ class FoodLogEntry(models.Model):
     fiber_consumed = models.DecimalField(_("Fiber Consumed"), max_digits=8, decimal_places=2, default=0)
     
     log_date = models.DateField(_("Log Date"), default=timezone.now)
+    # Set by offline clients on entries they create (see sync.py), so a retried push doesn't log them twice
+    client_id = models.CharField(_("Client ID"), max_length=64, null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = FoodLogEntryQuerySet.as_manager()
     
     class Meta:
         verbose_name = _("Food Log Entry")
         verbose_name_plural = _("Food Log Entries")
         ordering = ['-log_date', '-created_at']
+        indexes = [
+            # A user's days, and the whole table in the default order (e.g. the admin changelist)
+            models.Index(fields=['user', '-log_date']),
+            models.Index(fields=['-log_date', '-created_at']),
+            # Food name prefix search in the admin
+            models.Index(fields=['food_name']),
+            # Delta sync: a user's changes since a cursor
+            models.Index(fields=['user', 'updated_at', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'client_id'], condition=models.Q(client_id__isnull=False), name='unique_food_log_client_id',
+            ),
+        ]
         
+    # log_date as loaded from the database, so a change of day can invalidate the old day too
+    original_log_date = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.original_log_date = instance.__dict__.get('log_date')
+        return instance
+
     def __str__(self):
         return f"{self.user.name} ate {self.quantity} {self.quantity_unit} of {self.food_name} on {self.log_date}"
 
@@ -91,4 +171,150 @@ class FoodLogEntry(models.Model):
                 self.fat_consumed = (self.food_item.fat / 100) * self.quantity
         elif self.quantity is not None:
             pass
-        super().save(*args, **kwargs)
\ No newline at end of file
+        super().save(*args, **kwargs)
+
+
+class DeletedFoodLogEntry(models.Model):
+    """
+    Tombstone of a deleted FoodLogEntry, stored on the same shard, so sync clients learn about the
+    deletion. Pruned after SYNC_TOMBSTONE_DAYS by `manage.py prune_sync_tombstones`.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_("User"),
+        db_constraint=False,
+    )
+    entry_id = models.BigIntegerField(_("Entry ID"))
+    deleted_at = models.DateTimeField(_("Deleted At"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Deleted Food Log Entry")
+        verbose_name_plural = _("Deleted Food Log Entries")
+        indexes = [
+            models.Index(fields=['user', 'deleted_at', 'id']),
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.entry_id} of {self.user_id} deleted at {self.deleted_at}"
+
+
+class UserShard(models.Model):
+    """
+    Which FOOD_LOG_SHARDS database holds a user's food log entries.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='food_log_shard',
+    )
+    alias = models.CharField(_("Database Alias"), max_length=100)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("User Shard")
+        verbose_name_plural = _("User Shards")
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.alias}"
+
+
+class ArchivedFoodLogDay(models.Model):
+    """
+    One user-day of food log entries moved to cold storage by `manage.py archive_food_logs`:
+    the entries' API representation as zlib-compressed JSON, plus the day's totals.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_food_log_days',
+        verbose_name=_("User"),
+    )
+    log_date = models.DateField(_("Log Date"))
+    entry_count = models.PositiveIntegerField(_("Entries"), default=0)
+
+    total_calories = models.DecimalField(_("Total Calories"), max_digits=10, decimal_places=2, default=0)
+    total_protein = models.DecimalField(_("Total Protein"), max_digits=10, decimal_places=2, default=0)
+    total_carbs = models.DecimalField(_("Total Carbohydrates"), max_digits=10, decimal_places=2, default=0)
+    total_fat = models.DecimalField(_("Total Fat"), max_digits=10, decimal_places=2, default=0)
+    total_sugars = models.DecimalField(_("Total Sugars"), max_digits=10, decimal_places=2, default=0)
+    total_fiber = models.DecimalField(_("Total Fiber"), max_digits=10, decimal_places=2, default=0)
+
+    entries = models.BinaryField(_("Compressed Entries"), default=bytes)
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("Archived Food Log Day")
+        verbose_name_plural = _("Archived Food Log Days")
+        ordering = ['-log_date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'log_date'], name='unique_archived_food_log_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} on {self.log_date} ({self.entry_count} entries)"
+
+
+class FrequentFood(models.Model):
+    """
+    A food the user has logged before, for quick-add. Updated on every new log entry, so
+    reading a user's recent and frequent foods is a small indexed lookup.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='frequent_foods',
+        verbose_name=_("User"),
+    )
+    # "item:<food item id>", or "name:<food name>" for entries not linked to a food item
+    food_key = models.CharField(max_length=300)
+    food_item = models.ForeignKey(
+        FoodItem,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_("Food Item"),
+    )
+    food_name = models.CharField(_("Food Name"), max_length=255)
+    last_quantity = models.DecimalField(_("Last Quantity"), max_digits=8, decimal_places=2)
+    last_quantity_unit = models.CharField(_("Last Quantity Unit"), max_length=50)
+    log_count = models.PositiveIntegerField(_("Times Logged"), default=0)
+    last_logged_at = models.DateTimeField(_("Last Logged At"))
+
+    class Meta:
+        verbose_name = _("Frequent Food")
+        verbose_name_plural = _("Frequent Foods")
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'food_key'], name='unique_frequent_food'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-last_logged_at']),
+            models.Index(fields=['user', '-log_count', '-last_logged_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.food_name} ({self.log_count}x)"
+
+
+class PopularSearch(models.Model):
+    """
+    How often a food search query was made, so `manage.py warm_caches` can preload the most popular
+    ones after a deploy. Counted in memory and written in batches, see foodtracker.warmup.
+    """
+    query = models.CharField(_("Query"), max_length=255, unique=True)
+    search_count = models.PositiveIntegerField(_("Searches"), default=0)
+    last_searched_at = models.DateTimeField(_("Last Searched At"))
+
+    class Meta:
+        verbose_name = _("Popular Search")
+        verbose_name_plural = _("Popular Searches")
+        indexes = [
+            models.Index(fields=['-search_count', '-last_searched_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.query} ({self.search_count}x)"
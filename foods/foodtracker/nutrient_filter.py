@@ -0,0 +1,32 @@
+from django.db.models import Q
+from .models import FoodItem
+from .recipes import NUTRIENT_FIELDS
+
+
+def filter_foods(user, ranges, ordering, limit):
+    """
+    Food items within the given per-100g nutrient ranges ({field: (min, max)}, either may be None),
+    top `limit` by `ordering` ("protein", "-calories", ...). Every nutrient column is indexed, so the
+    database can walk the ordering column's index and stop after `limit` rows that match the ranges.
+    Covers the shared catalog and the user's own foods and recipes.
+    """
+    foods = FoodItem.objects.filter(Q(created_by__isnull=True) | Q(created_by=user))
+    for field, (low, high) in ranges.items():
+        if low is not None:
+            foods = foods.filter(**{f'{field}__gte': low})
+        if high is not None:
+            foods = foods.filter(**{f'{field}__lte': high})
+
+    field = ordering.lstrip('-')
+    # Foods without a value for the sort column can't be ranked by it
+    foods = foods.filter(**{f'{field}__isnull': False})
+    tie_break = '-id' if ordering.startswith('-') else 'id'
+    return foods.order_by(ordering, tie_break)[:limit]
+
+
+def nutrient_ranges(validated_data):
+    return {
+        field: (validated_data.get(f'min_{field}'), validated_data.get(f'max_{field}'))
+        for field in NUTRIENT_FIELDS
+        if f'min_{field}' in validated_data or f'max_{field}' in validated_data
+    }
@@ -0,0 +1,108 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# requests is imported on first use, it adds ~40 ms to every worker's startup
+OPEN_FOOD_FACTS_BASE_URL = "https://world.openfoodfacts.org/cgi/search.pl"
+OPEN_FOOD_FACTS_PRODUCT_URL = "https://world.openfoodfacts.org/api/v0/product/"
+
+def search_food_on_open_food_facts(query):
+    """
+    Searches for food items on Open Food Facts API.
+    Returns a list of dictionaries with basic food info.
+    """
+    import requests
+    params = {
+        'search_terms': query,
+        'json': 1,
+        'page_size': 20 # Limit results to 20 for brevity
+    }
+    try:
+
+        response = requests.get(OPEN_FOOD_FACTS_BASE_URL, params=params, timeout=10)
+
+# Print raw response text
+
+        response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
+
+        data = response.json()
+
+
+        if 'products' in data:
+
+            foods = []
+            for product in data['products']:
+                food_name = product.get('product_name') or product.get('product_name_en') or product.get('generic_name')
+                nutriments = product.get('nutriments', {})
+
+
+
+                if food_name: # Only include if a name is found
+                    food_info = {
+                        'name': food_name,
+                        'external_api_id': product.get('code'), # Use product code as external ID
+                        'calories': nutriments.get('energy-kcal_100g'),
+                        'protein': nutriments.get('proteins_100g'),
+                        'carbs': nutriments.get('carbohydrates_100g'),
+                        'fat': nutriments.get('fat_100g'),
+                        'sugars': nutriments.get('sugars_100g'),
+                        'fiber': nutriments.get('fiber_100g'),
+                        'unit': 'g' # Open Food Facts usually provides per 100g
+                    }
+                    foods.append(food_info)
+                
+
+        else:
+            logger.debug("No 'products' key in the Open Food Facts response for %r", query)
+            foods = [] # Ensure foods is empty if 'products' key is missing or response is empty
+
+        return foods
+    except requests.exceptions.RequestException as e:
+
+        return [] # Return empty list on error
+    except ValueError as e: # Catch JSON decoding errors
+
+        return []
+    except Exception as e: # Catch any other unexpected errors
+
+        return []
+
+
+def get_food_details_from_open_food_facts(external_id, raise_on_error=False):
+    """
+    Fetches detailed nutritional information for a specific product from Open Food Facts.
+    Returns None if the product is unknown, or on network errors unless raise_on_error is set
+    (so callers can tell a missing product from a failed lookup).
+    """
+    import requests
+    url = f"{OPEN_FOOD_FACTS_PRODUCT_URL}{external_id}.json"
+    try:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        
+        if 'product' in data:
+            product = data['product']
+            nutriments = product.get('nutriments', {})
+            
+            food_name = product.get('product_name') or product.get('product_name_en') or product.get('generic_name')
+            
+            # Construct detailed food info
+            detailed_info = {
+                'name': food_name,
+                'external_api_id': product.get('code'),
+                'calories': nutriments.get('energy-kcal_100g'),
+                'protein': nutriments.get('proteins_100g'),
+                'carbs': nutriments.get('carbohydrates_100g'),
+                'fat': nutriments.get('fat_100g'),
+                'unit': 'g',
+                'sugars': nutriments.get('sugars_100g'),
+                'fiber': nutriments.get('fiber_100g'),
+            }
+            return detailed_info
+        return None
+    except requests.exceptions.RequestException as e:
+        if raise_on_error:
+            raise
+        logger.warning("Error fetching Open Food Facts details for %s: %s", external_id, e)
+        return None
@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from .models import FrequentFood
+
+
+def food_key(food_item_id, food_name):
+    if food_item_id:
+        return f"item:{food_item_id}"
+    return f"name:{food_name.strip().lower()}"[:300]
+
+
+def record_logged_foods(user_id, entries):
+    """
+    Counts new log entries in the user's FrequentFood rows: one UPDATE per food, plus an INSERT
+    the first time a food is logged. Keeps at most QUICK_ADD_MAX_FOODS per user.
+    """
+    # Several entries of the same food (e.g. a copied day) are counted in one go, the last one wins
+    counts, latest = {}, {}
+    for entry in entries:
+        key = food_key(entry.food_item_id, entry.food_name)
+        counts[key] = counts.get(key, 0) + 1
+        latest[key] = entry
+
+    created = False
+    for key, entry in latest.items():
+        values = {
+            'food_name': entry.food_name,
+            'last_quantity': entry.quantity,
+            'last_quantity_unit': entry.quantity_unit,
+            'last_logged_at': entry.created_at,
+        }
+        increment = F('log_count') + counts[key]
+        if FrequentFood.objects.filter(user_id=user_id, food_key=key).update(log_count=increment, **values):
+            continue
+        try:
+            with transaction.atomic():
+                FrequentFood.objects.create(
+                    user_id=user_id, food_key=key, food_item_id=entry.food_item_id, log_count=counts[key], **values,
+                )
+            created = True
+        except IntegrityError:
+            # Created concurrently by another request
+            FrequentFood.objects.filter(user_id=user_id, food_key=key).update(log_count=increment, **values)
+
+    if created:
+        # Forget the least recently logged foods beyond the limit
+        stale = FrequentFood.objects.filter(user_id=user_id).order_by('-last_logged_at').values_list('pk', flat=True)
+        stale_ids = list(stale[settings.QUICK_ADD_MAX_FOODS:])
+        if stale_ids:
+            FrequentFood.objects.filter(pk__in=stale_ids).delete()
+
+
+def get_quick_add(user, limit):
+    """
+    The user's most recently and most frequently logged foods.
+    """
+    foods = FrequentFood.objects.filter(user=user)
+    return {
+        'recent': foods.order_by('-last_logged_at')[:limit],
+        'frequent': foods.order_by('-log_count', '-last_logged_at')[:limit],
+    }
+
+
+def rebuild_frequent_foods(user_id, entries):
+    """
+    Replaces the user's FrequentFood rows with ones built from their log history in one pass,
+    for users who logged food before quick-add existed. entries must be ordered by created_at.
+    """
+    foods = {}
+    for entry in entries:
+        key = food_key(entry.food_item_id, entry.food_name)
+        food = foods.get(key)
+        if food is None:
+            food = foods[key] = FrequentFood(user_id=user_id, food_key=key, food_item_id=entry.food_item_id)
+        food.food_name = entry.food_name
+        food.last_quantity = entry.quantity
+        food.last_quantity_unit = entry.quantity_unit
+        food.last_logged_at = entry.created_at
+        food.log_count += 1
+
+    keep = sorted(foods.values(), key=lambda food: food.last_logged_at, reverse=True)[:settings.QUICK_ADD_MAX_FOODS]
+    with transaction.atomic():
+        FrequentFood.objects.filter(user_id=user_id).delete()
+        FrequentFood.objects.bulk_create(keep)
+    return len(keep)
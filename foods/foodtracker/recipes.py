@@ -0,0 +1,100 @@
+from decimal import Decimal
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from .models import FoodItem, RecipeIngredient
+
+NUTRIENT_FIELDS = ('calories', 'protein', 'carbs', 'fat', 'sugars', 'fiber')
+CENT = Decimal('0.01')
+
+
+def creates_cycle(recipe_id, ingredient_id):
+    """
+    True if adding the ingredient would make the recipe contain itself, directly or through other recipes.
+    """
+    seen, frontier = set(), {ingredient_id}
+    while frontier:
+        if recipe_id in frontier:
+            return True
+        seen |= frontier
+        frontier = set(
+            RecipeIngredient.objects.filter(recipe_id__in=frontier).values_list('ingredient_id', flat=True)
+        ) - seen
+    return False
+
+
+def _recompute(recipe_ids):
+    """
+    Stores the per-100g nutrients of the given recipes, computed from their ingredients' current
+    values in one aggregate query. Uses bulk_update, so no signals fire.
+    """
+    zero = Value(Decimal(0))
+    totals = {
+        row['recipe_id']: row
+        for row in RecipeIngredient.objects.filter(recipe_id__in=recipe_ids).values('recipe_id').annotate(
+            weight=Sum('quantity'),
+            **{
+                field: Sum(F('quantity') * Coalesce(f'ingredient__{field}', zero), output_field=DecimalField())
+                for field in NUTRIENT_FIELDS
+            },
+        )
+    }
+    recipes = []
+    now = timezone.now()
+    for recipe_id in recipe_ids:
+        row = totals.get(recipe_id)
+        recipe = FoodItem(pk=recipe_id, updated_at=now)
+        for field in NUTRIENT_FIELDS:
+            # sum(grams * per-100g value / 100) over ingredients, per 100 g of the recipe
+            value = None
+            if row and row['weight']:
+                value = (Decimal(row[field] or 0) / Decimal(row['weight'])).quantize(CENT)
+            setattr(recipe, field, value)
+        recipes.append(recipe)
+    FoodItem.objects.bulk_update(recipes, [*NUTRIENT_FIELDS, 'updated_at'])
+
+
+def update_recipes(recipe_ids):
+    """
+    Recomputes the given recipes and every recipe that contains them, directly or not.
+    Each recipe is computed once, after all of its ingredients, one aggregate query per level
+    of the dependency graph. Returns the number of recipes updated.
+    """
+    affected = set(recipe_ids)
+    edges = set()  # (ingredient, recipe)
+    frontier = set(recipe_ids)
+    while frontier:
+        # Walk up used_in one level per query
+        found = set(RecipeIngredient.objects.filter(ingredient_id__in=frontier).values_list('ingredient_id', 'recipe_id'))
+        edges |= found
+        users = {recipe_id for _, recipe_id in found}
+        frontier = users - affected
+        affected |= users
+
+    waiting_on = {recipe_id: set() for recipe_id in affected}
+    for ingredient_id, recipe_id in edges:
+        if ingredient_id in affected:
+            waiting_on[recipe_id].add(ingredient_id)
+
+    updated = 0
+    while waiting_on:
+        ready = [recipe_id for recipe_id, ingredients in waiting_on.items() if not ingredients]
+        if not ready:
+            # Only possible with a cycle, which creates_cycle() keeps out
+            break
+        _recompute(ready)
+        updated += len(ready)
+        for recipe_id in ready:
+            del waiting_on[recipe_id]
+        for ingredients in waiting_on.values():
+            ingredients.difference_update(ready)
+    return updated
+
+
+def update_recipes_using(food_item):
+    """
+    Called after a food item's nutrients may have changed.
+    """
+    recipe_ids = set(RecipeIngredient.objects.filter(ingredient=food_item).values_list('recipe_id', flat=True))
+    if recipe_ids:
+        update_recipes(recipe_ids)
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+
+SHARDED_MODELS = {'foodtracker.foodlogentry', 'foodtracker.deletedfoodlogentry'}
+
+
+def is_sharded(model):
+    return model._meta.label_lower in SHARDED_MODELS
+
+
+class FoodLogShardRouter:
+    """
+    Routes FoodLogEntry queries to the FOOD_LOG_SHARDS database that holds the user's entries.
+
+    The shard is taken from the instance hint: an entry (its own database, or its user's shard
+    when unsaved) or a user (e.g. `user.food_logs.all()`). Other queries need an explicit
+    shard, use `FoodLogEntry.objects.for_user(user)`. Everything else falls through to the
+    next router.
+    """
+
+    def _shard_for(self, hints, for_write=False):
+        from .sharding import get_user_shard
+
+        instance = hints.get('instance')
+        if instance is None:
+            return None
+        if is_sharded(type(instance)):
+            if instance._state.db in settings.FOOD_LOG_SHARDS:
+                return instance._state.db
+            return get_user_shard(instance.user_id, for_write=for_write) if instance.user_id else None
+        if isinstance(instance, get_user_model()):
+            return get_user_shard(instance.pk, for_write=for_write)
+        return None
+
+    def _is_from_entry(self, hints):
+        # e.g. entry.user or entry.food_item: Django would otherwise look them up on the entry's shard
+        instance = hints.get('instance')
+        return instance is not None and is_sharded(type(instance))
+
+    def db_for_read(self, model, **hints):
+        if len(settings.FOOD_LOG_SHARDS) == 1:
+            return None
+        if not is_sharded(model):
+            return router.db_for_read(model) if self._is_from_entry(hints) else None
+        return self._shard_for(hints)
+
+    def db_for_write(self, model, **hints):
+        if len(settings.FOOD_LOG_SHARDS) == 1:
+            return None
+        if not is_sharded(model):
+            return router.db_for_write(model) if self._is_from_entry(hints) else None
+        return self._shard_for(hints, for_write=True)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Entries reference users and food items that live on the default database
+        if is_sharded(type(obj1)) or is_sharded(type(obj2)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db != 'default' and db in settings.FOOD_LOG_SHARDS:
+            # Shards only hold the foodtracker tables
+            return app_label == 'foodtracker'
+        return None
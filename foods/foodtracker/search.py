@@ -0,0 +1,88 @@
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .fuzzy import fuzzy_food_search
+from .models import PopularSearch
+from .open_food_facts import search_food_on_open_food_facts
+from .serializer import FoodItemSerializer
+
+# Search counts not yet written to PopularSearch, flushed every SEARCH_STATS_FLUSH_SECONDS
+_pending_counts = {}
+_pending_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+
+def search_cache_key(query):
+    # Results don't depend on who searched, so all users share them
+    return f"food_search_{normalize_query(query)}"
+
+
+def search_foods(query):
+    """
+    Open Food Facts results for the query, from the shared cache when another user searched it recently.
+    When Open Food Facts finds nothing (or fails), typo-tolerant matches from the local catalog are returned
+    instead, cached only briefly so Open Food Facts is asked again soon.
+    """
+    key = search_cache_key(query)
+    results = cache.get(key)
+    if results is None:
+        results = search_food_on_open_food_facts(query)
+        if results:
+            cache.set(key, results, settings.SEARCH_CACHE_TIMEOUT)
+        else:
+            results = FoodItemSerializer(fuzzy_food_search(query), many=True).data
+            cache.set(key, results, settings.SEARCH_EMPTY_CACHE_TIMEOUT)
+    record_search(query)
+    return results
+
+
+def record_search(query):
+    """
+    Counts a search in memory; the counts are added to PopularSearch in one go now and then, so
+    searching doesn't cost a database write.
+    """
+    global _last_flush
+    query = normalize_query(query)[:255]
+    with _pending_lock:
+        _pending_counts[query] = _pending_counts.get(query, 0) + 1
+        if time.monotonic() - _last_flush < settings.SEARCH_STATS_FLUSH_SECONDS:
+            return
+        counts = _pending_counts.copy()
+        _pending_counts.clear()
+        _last_flush = time.monotonic()
+    flush_search_counts(counts)
+
+
+def flush_search_counts(counts):
+    now = timezone.now()
+    for query, count in counts.items():
+        increment = F('search_count') + count
+        if PopularSearch.objects.filter(query=query).update(search_count=increment, last_searched_at=now):
+            continue
+        try:
+            with transaction.atomic():
+                PopularSearch.objects.create(query=query, search_count=count, last_searched_at=now)
+        except IntegrityError:
+            # Created concurrently by another worker
+            PopularSearch.objects.filter(query=query).update(search_count=increment, last_searched_at=now)
+
+
+def popular_queries(limit, days):
+    """
+    The most searched queries among those searched in the last `days` days.
+    """
+    since = timezone.now() - timedelta(days=days)
+    return list(
+        PopularSearch.objects.filter(last_searched_at__gte=since)
+        .order_by('-search_count', '-last_searched_at')
+        .values_list('query', flat=True)[:limit]
+    )
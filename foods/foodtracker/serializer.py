@@ -1,5 +1,11 @@
+from decimal import Decimal
 from rest_framework import serializers
-from .models import FoodItem, FoodLogEntry
+from .models import FoodItem, FoodLogEntry, FrequentFood, RecipeIngredient
+from .recipes import NUTRIENT_FIELDS, creates_cycle, update_recipes
+from .sharding import get_user_shard
+from .sync import Cursor
+from django.conf import settings
+from django.db import transaction
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 
@@ -9,9 +15,9 @@ class FoodItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = FoodItem
         fields = ['id', 'name', 'calories', 'protein', 'carbs', 'fat', 'sugars', 'fiber',
-            'unit', 'external_api_id', 'created_by', 'created_at', 'updated_at'
+            'unit', 'external_api_id', 'is_recipe', 'created_by', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['created_at', 'updated_at', 'created_by']
+        read_only_fields = ['is_recipe', 'created_at', 'updated_at', 'created_by']
 
 class FoodLogEntrySerializer(serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.name', read_only=True)
@@ -42,7 +48,9 @@ class FoodLogEntrySerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Set the user to the authenticated user making the request
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
+        # Entries are stored on the user's shard
+        shard = get_user_shard(validated_data['user'].pk, for_write=True)
+        return FoodLogEntry.objects.db_manager(shard).create(**validated_data)
 
     def update(self, instance, validated_data):
         # Ensure user cannot be changed
@@ -56,4 +64,207 @@ class FoodSearchSerializer(serializers.Serializer):
         max_length=255,
         required=True,
         help_text=_("The food item to search for (e.g., 'apple', 'chicken breast')")
-    )
\ No newline at end of file
+    )
+
+
+class FrequentFoodSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FrequentFood
+        fields = ['food_item', 'food_name', 'last_quantity', 'last_quantity_unit', 'log_count', 'last_logged_at']
+        read_only_fields = fields
+
+
+class QuickAddQuerySerializer(serializers.Serializer):
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=50,
+        default=10,
+        help_text=_("How many recent and frequent foods to return (max 50)")
+    )
+
+
+class FoodFilterSerializer(serializers.Serializer):
+    """
+    min_<nutrient> / max_<nutrient> per 100 g for each of NUTRIENT_FIELDS, e.g. min_protein=20&max_calories=200.
+    """
+    ordering = serializers.ChoiceField(
+        choices=[prefix + field for field in NUTRIENT_FIELDS for prefix in ('', '-')],
+        default='-protein',
+        help_text=_("Nutrient to sort by, prefixed with '-' for highest first")
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=20,
+        help_text=_("How many foods to return (max 100)")
+    )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for field in NUTRIENT_FIELDS:
+            for bound in ('min', 'max'):
+                fields[f'{bound}_{field}'] = serializers.DecimalField(
+                    max_digits=8, decimal_places=2, min_value=Decimal(0), required=False,
+                    help_text=_("%(bound)s %(nutrient)s per 100 g") % {'bound': bound.capitalize(), 'nutrient': field}
+                )
+        return fields
+
+    def validate(self, attrs):
+        for field in NUTRIENT_FIELDS:
+            low, high = attrs.get(f'min_{field}'), attrs.get(f'max_{field}')
+            if low is not None and high is not None and low > high:
+                raise serializers.ValidationError({f'min_{field}': _("Must not be greater than max_%s.") % field})
+        return attrs
+
+
+class BarcodeLookupSerializer(serializers.Serializer):
+    codes = serializers.ListField(
+        child=serializers.RegexField(r'^\d{8,14}$'),
+        min_length=1,
+        max_length=settings.BARCODE_BATCH_MAX,
+        help_text=_("EAN/UPC barcodes to look up")
+    )
+
+
+class CopyFoodLogEntriesSerializer(serializers.Serializer):
+    source_date = serializers.DateField(
+        required=False,
+        help_text=_("Copy the entries logged on this date (e.g. yesterday)")
+    )
+    entry_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        max_length=200,
+        help_text=_("Copy these entries (e.g. one meal); combined with source_date, only those of that date")
+    )
+    target_dates = serializers.ListField(
+        child=serializers.DateField(),
+        min_length=1,
+        max_length=31,
+        help_text=_("Dates to log the copies on")
+    )
+
+    def validate(self, attrs):
+        if 'source_date' not in attrs and not attrs.get('entry_ids'):
+            raise serializers.ValidationError(_("Give a source_date or entry_ids to copy."))
+        attrs['target_dates'] = sorted(set(attrs['target_dates']))
+        return attrs
+
+
+class SyncChangeSerializer(serializers.Serializer):
+    """
+    An entry the client created (client_id, no id) or changed (id) while offline.
+    """
+    id = serializers.IntegerField(required=False, help_text=_("Id of the entry changed, omit for new entries"))
+    client_id = serializers.CharField(
+        max_length=64,
+        required=False,
+        help_text=_("The client's id for a new entry, pushing it again doesn't log it twice")
+    )
+    base_updated_at = serializers.DateTimeField(
+        required=False,
+        help_text=_("updated_at of the entry as the client last saw it; newer changes on the server win")
+    )
+    food_item = serializers.PrimaryKeyRelatedField(queryset=FoodItem.objects.all(), required=False, allow_null=True)
+    food_name = serializers.CharField(max_length=255, required=False)
+    quantity = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=Decimal(0), required=False)
+    quantity_unit = serializers.CharField(max_length=50, required=False)
+    log_date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if 'id' in attrs:
+            if attrs.get('food_item', True) is None and not attrs.get('food_name'):
+                raise serializers.ValidationError({"food_name": _("Required when unlinking the food item.")})
+            return attrs
+        if 'client_id' not in attrs:
+            raise serializers.ValidationError({"client_id": _("Required for new entries.")})
+        for field in ('quantity', 'quantity_unit'):
+            if field not in attrs:
+                raise serializers.ValidationError({field: _("Required for new entries.")})
+        if not attrs.get('food_item') and not attrs.get('food_name'):
+            raise serializers.ValidationError({"food_name": _("Give a food_item or a food_name.")})
+        return attrs
+
+
+class SyncSerializer(serializers.Serializer):
+    cursor = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        help_text=_("The cursor returned by the previous sync, omit for a first (full) sync")
+    )
+    changes = SyncChangeSerializer(many=True, required=False, max_length=settings.SYNC_MAX_CHANGES)
+    deleted = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        max_length=settings.SYNC_MAX_CHANGES,
+        help_text=_("Ids of the entries deleted on the client")
+    )
+
+    def validate_cursor(self, value):
+        if not value:
+            return None
+        try:
+            return Cursor.decode(value)
+        except ValueError:
+            raise serializers.ValidationError(_("Invalid cursor, sync again without one."))
+
+
+class RecipeIngredientSerializer(serializers.ModelSerializer):
+    ingredient_name = serializers.CharField(source='ingredient.name', read_only=True)
+    quantity = serializers.DecimalField(max_digits=8, decimal_places=2, min_value=Decimal('0.01'))
+
+    class Meta:
+        model = RecipeIngredient
+        fields = ['ingredient', 'ingredient_name', 'quantity']
+
+
+class RecipeSerializer(serializers.ModelSerializer):
+    """
+    A recipe is a FoodItem whose per-100g nutrients are computed from its ingredients (in grams),
+    so it is logged like any other food.
+    """
+    ingredients = RecipeIngredientSerializer(many=True)
+
+    class Meta:
+        model = FoodItem
+        fields = ['id', 'name', *NUTRIENT_FIELDS, 'unit', 'ingredients', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = [*NUTRIENT_FIELDS, 'unit', 'created_by', 'created_at', 'updated_at']
+
+    def validate_ingredients(self, value):
+        if not value:
+            raise serializers.ValidationError(_("A recipe needs at least one ingredient."))
+        ingredient_ids = [item['ingredient'].pk for item in value]
+        if len(set(ingredient_ids)) != len(ingredient_ids):
+            raise serializers.ValidationError(_("Each ingredient can only be listed once."))
+        if self.instance is not None:
+            for ingredient_id in ingredient_ids:
+                if creates_cycle(self.instance.pk, ingredient_id):
+                    raise serializers.ValidationError(_("A recipe can't contain itself."))
+        return value
+
+    def _set_ingredients(self, recipe, ingredients):
+        RecipeIngredient.objects.filter(recipe=recipe).delete()
+        RecipeIngredient.objects.bulk_create([
+            RecipeIngredient(recipe=recipe, ingredient=item['ingredient'], quantity=item['quantity'])
+            for item in ingredients
+        ])
+        # Recomputes this recipe and every recipe that uses it
+        update_recipes([recipe.pk])
+        recipe.refresh_from_db(fields=NUTRIENT_FIELDS)
+
+    def create(self, validated_data):
+        ingredients = validated_data.pop('ingredients')
+        with transaction.atomic():
+            recipe = FoodItem.objects.create(
+                is_recipe=True, unit='g', created_by=self.context['request'].user, **validated_data
+            )
+            self._set_ingredients(recipe, ingredients)
+        return recipe
+
+    def update(self, instance, validated_data):
+        ingredients = validated_data.pop('ingredients', None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if ingredients is not None:
+                self._set_ingredients(instance, ingredients)
+        return instance
@@ -0,0 +1,162 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.utils import timezone
+from foods.routers import PrimaryReplicaRouter
+from .models import DeletedFoodLogEntry, FoodLogEntry, UserShard
+from .signals import muted_signals
+
+# Each shard hands out FoodLogEntry ids from its own range, so ids are unique across shards
+SHARD_ID_SPACING = 10 ** 12
+
+
+def shard_cache_key(user_id):
+    return f"food_log_shard_{user_id}"
+
+
+def get_user_shard(user_id, for_write=False):
+    """
+    Returns the database alias holding the user's food log entries.
+    New users are spread over FOOD_LOG_SHARDS by id; the choice is recorded in UserShard on
+    their first write, so adding shards later never moves existing data implicitly.
+    Cached for FOOD_LOG_SHARD_CACHE_TIMEOUT seconds, so with a per-process cache every worker
+    picks up a move within that time.
+    """
+    shards = settings.FOOD_LOG_SHARDS
+    if len(shards) == 1:
+        return shards[0]
+
+    key = shard_cache_key(user_id)
+    alias = cache.get(key)
+    if alias is not None:
+        return alias
+
+    alias = UserShard.objects.filter(user_id=user_id).values_list('alias', flat=True).first()
+    if alias is None:
+        alias = shards[int(user_id) % len(shards)]
+        if not for_write:
+            # Nothing stored for this user yet, don't pin the guess for long
+            cache.set(key, alias, min(300, settings.FOOD_LOG_SHARD_CACHE_TIMEOUT))
+            return alias
+        try:
+            UserShard.objects.create(user_id=user_id, alias=alias)
+        except IntegrityError:
+            # A concurrent request recorded it first
+            alias = UserShard.objects.using('default').get(user_id=user_id).alias
+
+    cache.set(key, alias, settings.FOOD_LOG_SHARD_CACHE_TIMEOUT)
+    return alias
+
+
+def get_user_read_shard(user_id):
+    """
+    The alias to read a user's entries from, or None when there is a single shard and the routers
+    decide (primary or a replica). Users on 'default' read from its replicas too.
+    """
+    if len(settings.FOOD_LOG_SHARDS) == 1:
+        return None
+    alias = get_user_shard(user_id)
+    if alias == DEFAULT_DB_ALIAS:
+        return PrimaryReplicaRouter().db_for_read(FoodLogEntry) or alias
+    return alias
+
+
+def set_user_shard(user_id, alias):
+    UserShard.objects.update_or_create(user_id=user_id, defaults={'alias': alias})
+    cache.set(shard_cache_key(user_id), alias, settings.FOOD_LOG_SHARD_CACHE_TIMEOUT)
+
+
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _sqlite_id_limit(alias):
+    """
+    The highest FoodLogEntry id a SQLite shard has handed out. SQLite numbers new rows after the highest
+    id in the table, whatever sqlite_sequence says, so an entry copied in with a higher id (from a shard
+    with a higher id range) would make the shard continue in that range and hand out its ids again.
+    """
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = %s", [FoodLogEntry._meta.db_table])
+        row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _copy_entries(queryset, target, batch_size):
+    """
+    Copies entries to the target shard in batches, keeping their ids and timestamps, so clients holding
+    an id can still edit or delete the entry. Only on SQLite, entries moved to a shard with a lower id
+    range get new ids there. Returns {source id: target id}.
+    """
+    id_limit = _sqlite_id_limit(target) if connections[target].vendor == 'sqlite' else None
+    copied = {}
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:batch_size])
+        if not batch:
+            return copied
+        last_pk = batch[-1].pk
+        with muted_signals(), transaction.atomic(using=target):
+            for entry in batch:
+                source_pk = entry.pk
+                if id_limit is not None and entry.pk > id_limit:
+                    entry.pk = None
+                # raw skips auto_now/auto_now_add, like loading a fixture
+                entry.save_base(using=target, raw=True, force_insert=True)
+                copied[source_pk] = entry.pk
+
+
+def move_user_entries(user_id, target, batch_size=500):
+    """
+    Moves a user's entries to another shard in batches while the user keeps using the app.
+    Returns the number of entries now on the target shard.
+    """
+    source = get_user_shard(user_id)
+    if source == target:
+        return 0
+    started = timezone.now()
+    entries = FoodLogEntry.objects.filter(user_id=user_id)
+
+    # 1. Copy what exists now, writes still go to the source meanwhile
+    copied = _copy_entries(entries.using(source), target, batch_size)
+
+    # 2. Switch: from here on the user's reads and writes go to the target
+    set_user_shard(user_id, target)
+
+    # 3. Catch up with entries created, edited or deleted on the source during the copy
+    source_ids = set(entries.using(source).values_list('pk', flat=True))
+    # New entries are found in Python: a NOT IN over every copied id would exceed SQLite's variable limit
+    stale_ids = set(entries.using(source).filter(updated_at__gte=started).values_list('pk', flat=True))
+    stale_ids |= source_ids - copied.keys()
+    outdated = [copied[pk] for pk in (stale_ids | (copied.keys() - source_ids)) if pk in copied]
+    with muted_signals():
+        for chunk in _chunks(outdated, batch_size):
+            entries.using(target).filter(pk__in=chunk).delete()
+        for chunk in _chunks(stale_ids, batch_size):
+            _copy_entries(entries.using(source).filter(pk__in=chunk), target, batch_size)
+
+        # 4. Remove the originals. Their tombstones go too: sync clients start over after a move
+        for chunk in _chunks(source_ids, batch_size):
+            entries.using(source).filter(pk__in=chunk).delete()
+        DeletedFoodLogEntry.objects.using(source).filter(user_id=user_id).delete()
+
+    return entries.using(target).count()
+
+
+def pin_existing_users(batch_size=1000):
+    """
+    Records 'default' as the shard of every user that already has entries there.
+    Run it once when enabling FOOD_LOG_SHARDS, before users would be spread to other shards by id.
+    Returns the number of users pinned.
+    """
+    user_ids = FoodLogEntry.objects.using('default').order_by().values_list('user_id', flat=True).distinct()
+    pinned = 0
+    for chunk in _chunks(user_ids, batch_size):
+        UserShard.objects.bulk_create(
+            [UserShard(user_id=user_id, alias='default') for user_id in chunk],
+            ignore_conflicts=True,
+        )
+        pinned += len(chunk)
+    return pinned
@@ -0,0 +1,67 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from .models import DeletedFoodLogEntry, FoodItem, FoodLogEntry
+from .quick_add import record_logged_foods
+from .recipes import update_recipes_using
+from .versioning import bump_log_versions
+
+_muted = ContextVar('food_log_signals_muted', default=False)
+
+
+@contextmanager
+def muted_signals():
+    """
+    For jobs that move entries between storages (e.g. shards) without the user changing anything:
+    saves and deletes inside the block don't count as changes.
+    """
+    token = _muted.set(True)
+    try:
+        yield
+    finally:
+        _muted.reset(token)
+
+
+@receiver(post_save, sender=FoodLogEntry)
+@receiver(post_delete, sender=FoodLogEntry)
+def bump_food_log_versions(sender, instance, **kwargs):
+    if kwargs.get('raw') or _muted.get():
+        return
+    # log_date may still be the timezone.now() default (a datetime), normalize like the DB does
+    to_date = FoodLogEntry._meta.get_field('log_date').to_python
+    log_date = to_date(instance.log_date)
+    # An entry moved to another day changes both the old and the new day
+    log_dates = {str(log_date), str(to_date(instance.original_log_date or log_date))}
+    bump_log_versions(instance.user_id, log_dates)
+    instance.original_log_date = log_date
+
+
+@receiver(post_save, sender=FoodLogEntry)
+def count_frequent_food(sender, instance, created, **kwargs):
+    # Only new entries count, bulk_create() callers call record_logged_foods() themselves
+    if created and not kwargs.get('raw') and not _muted.get():
+        record_logged_foods(instance.user_id, [instance])
+
+
+@receiver(post_delete, sender=FoodLogEntry)
+def record_deleted_entry(sender, instance, using, **kwargs):
+    # Entries moved, archived or purged with their account aren't deletions for sync clients
+    if not _muted.get():
+        DeletedFoodLogEntry.objects.using(using).create(user_id=instance.user_id, entry_id=instance.pk)
+
+
+@receiver(post_save, sender=FoodItem)
+def update_recipe_nutrients(sender, instance, created, **kwargs):
+    # A new food item isn't in any recipe yet
+    if not created and not kwargs.get('raw'):
+        update_recipes_using(instance)
+
+
+@receiver(pre_delete, sender=FoodItem)
+def unlink_logged_food_item(sender, instance, using, **kwargs):
+    # on_delete=SET_NULL only reaches the entries on the food item's own database, not the other shards
+    for alias in settings.FOOD_LOG_SHARDS:
+        if alias != using:
+            FoodLogEntry.objects.using(alias).filter(food_item_id=instance.pk).update(food_item=None)
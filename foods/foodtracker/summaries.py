@@ -0,0 +1,62 @@
+import decimal
+from django.core.cache import cache
+from django.db.models import Sum
+from foods.response_cache import encode_response
+from .archive import archived_totals, merge_archived_entries
+from .models import FoodLogEntry
+from .serializer import FoodLogEntrySerializer
+from .versioning import get_etag
+
+SUMMARY_CACHE_TIMEOUT = 900
+
+
+def summary_cache_key(etag):
+    # The ETag changes with every write to the day, so cached summaries never go stale
+    return f"daily_summary_bytes_{etag}"
+
+
+def build_daily_summary(user, log_date):
+    """
+    The user's totals and entries for one date, including whatever of it was moved to the archive.
+    """
+    daily_logs = FoodLogEntry.objects.for_user(user).filter(
+        log_date=log_date
+    )
+
+    summary = daily_logs.aggregate(
+        total_calories=Sum('calories_consumed'),
+        total_protein=Sum('protein_consumed'),
+        total_carbs=Sum('carbs_consumed'),
+        total_fat=Sum('fat_consumed'),
+        total_sugars=Sum('sugars_consumed'),
+        total_fiber=Sum('fiber_consumed')
+    )
+
+    # Add whatever of this day was moved to the archive
+    archived = archived_totals(user, log_date)
+    if archived:
+        for total, value in archived.items():
+            summary[total] = (summary[total] or decimal.Decimal(0)) + value
+    log_entries = FoodLogEntrySerializer(daily_logs, many=True).data
+
+    return {
+        "date": log_date.strftime('%Y-%m-%d'),
+        "total_calories": round(summary['total_calories'] or decimal.Decimal(0), 2),
+        "total_protein": round(summary['total_protein'] or decimal.Decimal(0), 2),
+        "total_carbs": round(summary['total_carbs'] or decimal.Decimal(0), 2),
+        "total_fat": round(summary['total_fat'] or decimal.Decimal(0), 2),
+        "total_sugars": round(summary['total_sugars'] or decimal.Decimal(0), 2),
+        "total_fiber": round(summary['total_fiber'] or decimal.Decimal(0), 2),
+        "log_entries": merge_archived_entries(user, log_entries, log_date) if archived else log_entries
+    }
+
+
+def cache_daily_summary(user, log_date, etag=None):
+    """
+    Encodes the summary once and caches the bytes DailySummaryView serves. Returns the cache entry.
+    """
+    if etag is None:
+        etag = get_etag(user.pk, log_date)
+    entry = encode_response(build_daily_summary(user, log_date))
+    cache.set(summary_cache_key(etag), entry, SUMMARY_CACHE_TIMEOUT)
+    return entry
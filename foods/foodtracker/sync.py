@@ -0,0 +1,221 @@
+"""
+Delta sync for offline-first clients: one call pushes the client's queued changes and returns the user's
+food log entries created or changed since the client's cursor, plus the ids of entries deleted since.
+
+The cursor is opaque to clients. It holds two positions, (updated_at, id) in the user's entries and
+(deleted_at, id) in their tombstones (DeletedFoodLogEntry), so a sync reads only the rows after them,
+through the (user, updated_at, id) indexes, however long the history is.
+
+A row is stamped before its transaction commits, so a concurrent write may show up with a slightly older
+timestamp than rows already handed out. The last page's positions are therefore kept SYNC_CURSOR_LAG_SECONDS
+behind now: the most recent rows are sent again on the next sync, which clients apply as upserts.
+
+Clients start over ("reset") when their cursor is older than SYNC_TOMBSTONE_DAYS (tombstones pruned since)
+or than the last move of the user's entries to another shard. Archived days aren't synced, the logs
+endpoint reads through to them.
+"""
+import base64
+import json
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import DeletedFoodLogEntry, FoodLogEntry, UserShard
+from .recipes import NUTRIENT_FIELDS
+from .sharding import get_user_shard
+
+
+class Cursor:
+    def __init__(self, updated_at=None, entry_id=0, deleted_at=None, tombstone_id=0, issued_at=None):
+        self.updated_at = updated_at
+        self.entry_id = entry_id
+        self.deleted_at = deleted_at
+        self.tombstone_id = tombstone_id
+        self.issued_at = issued_at
+
+    def encode(self):
+        data = [
+            self.updated_at and self.updated_at.isoformat(), self.entry_id,
+            self.deleted_at and self.deleted_at.isoformat(), self.tombstone_id,
+            self.issued_at.isoformat(),
+        ]
+        return base64.urlsafe_b64encode(json.dumps(data, separators=(',', ':')).encode()).decode().rstrip('=')
+
+    @classmethod
+    def decode(cls, value):
+        """
+        Raises ValueError for anything this module didn't hand out.
+        """
+        try:
+            data = json.loads(base64.urlsafe_b64decode(value + '=' * (-len(value) % 4)))
+            updated_at, entry_id, deleted_at, tombstone_id, issued_at = data
+            cursor = cls(
+                updated_at and parse_datetime(updated_at), int(entry_id),
+                deleted_at and parse_datetime(deleted_at), int(tombstone_id), parse_datetime(issued_at),
+            )
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise ValueError("Invalid sync cursor")
+        if cursor.issued_at is None:
+            raise ValueError("Invalid sync cursor")
+        return cursor
+
+
+def _is_stale(user_id, cursor):
+    if cursor.issued_at < timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS):
+        return True
+    if len(settings.FOOD_LOG_SHARDS) == 1:
+        return False
+    # Moved entries may have new ids, and their tombstones stayed behind
+    moved_at = UserShard.objects.filter(user_id=user_id).values_list('updated_at', flat=True).first()
+    return moved_at is not None and moved_at > cursor.issued_at
+
+
+def _after(queryset, field, position, last_id):
+    if position is None:
+        return queryset
+    return queryset.filter(Q(**{f'{field}__gt': position}) | Q(**{field: position, 'pk__gt': last_id}))
+
+
+def _lagged(position, last_id, now):
+    # Never ahead of the rows that may still be committing
+    limit = now - timedelta(seconds=settings.SYNC_CURSOR_LAG_SECONDS)
+    if position is not None and position > limit:
+        return limit, 0
+    return position, last_id
+
+
+def consumed_nutrients(food_item, quantity):
+    """
+    The *_consumed values of an entry, like the logs endpoint computes them (0 without a food item).
+    """
+    values = {f'{field}_consumed': Decimal(0) for field in NUTRIENT_FIELDS}
+    if food_item is not None and quantity is not None:
+        for field in NUTRIENT_FIELDS:
+            per_100g = getattr(food_item, field)
+            if per_100g is not None:
+                values[f'{field}_consumed'] = (per_100g / 100) * quantity
+    return values
+
+
+def _apply_change(entry, change):
+    for field in ('food_item', 'food_name', 'quantity', 'quantity_unit', 'log_date'):
+        if field in change:
+            setattr(entry, field, change[field])
+    if change.get('food_item') is not None:
+        entry.food_name = change['food_item'].name
+    for field, value in consumed_nutrients(entry.food_item, entry.quantity).items():
+        setattr(entry, field, value)
+    entry.save()
+
+
+def _create_entry(user, entries, change):
+    """
+    Saves a new entry and returns its id, or the id of the one an overlapping push of the same client_id
+    created first.
+    """
+    entry = FoodLogEntry(user=user, client_id=change['client_id'], log_date=timezone.localdate())
+    try:
+        with transaction.atomic(using=entries.db):
+            _apply_change(entry, change)
+    except IntegrityError:
+        return entries.get(client_id=change['client_id']).pk
+    return entry.pk
+
+
+def apply_client_changes(user, changes, deleted_ids):
+    """
+    Applies a client's queued creates/updates (SyncChangeSerializer data) and deletions in one transaction
+    on the user's shard. Entries are saved one by one, so versions, quick-add and tombstones follow.
+    Returns (created [{client_id, id}], rejected [{id or client_id, reason}]).
+    """
+    shard = get_user_shard(user.pk, for_write=True)
+    entries = FoodLogEntry.objects.using(shard).filter(user_id=user.pk)
+    entry_ids = [change['id'] for change in changes if 'id' in change] + list(deleted_ids)
+    client_ids = [change['client_id'] for change in changes if 'id' not in change]
+
+    created, rejected = [], []
+    with transaction.atomic(using=shard):
+        # Locked, so an edit from another device can't commit between the conflict check and the save
+        existing = entries.select_for_update().in_bulk(entry_ids)
+        # Pushed before, but the client never got the response
+        already_created = dict(entries.filter(client_id__in=client_ids).values_list('client_id', 'pk'))
+
+        for change in changes:
+            if 'id' not in change:
+                client_id = change['client_id']
+                if client_id not in already_created:
+                    already_created[client_id] = _create_entry(user, entries, change)
+                created.append({'client_id': client_id, 'id': already_created[client_id]})
+                continue
+
+            entry = existing.get(change['id'])
+            if entry is None:
+                # Deleted meanwhile (its tombstone is in this response), archived, or never the user's
+                rejected.append({'id': change['id'], 'reason': 'not_found'})
+            elif 'base_updated_at' in change and entry.updated_at > change['base_updated_at']:
+                # Changed on another device since the client last saw it, the server's version is sent back
+                rejected.append({'id': change['id'], 'reason': 'conflict'})
+            else:
+                _apply_change(entry, change)
+
+        for entry_id in deleted_ids:
+            entry = existing.pop(entry_id, None)
+            if entry is not None:
+                entry.delete()
+    return created, rejected
+
+
+def changes_since(user, cursor=None, page_size=None):
+    """
+    One page of the user's changes after the cursor:
+    {'changes': [FoodLogEntry], 'deleted': [entry ids], 'cursor': Cursor, 'has_more': bool, 'reset': bool}.
+    With reset, the client drops its copy and pages through all live entries from here.
+    """
+    page_size = page_size or settings.SYNC_PAGE_SIZE
+    now = timezone.now()
+    reset = cursor is not None and _is_stale(user.pk, cursor)
+    if cursor is None or reset:
+        # All live entries, and only the deletions from now on
+        cursor = Cursor(deleted_at=now - timedelta(seconds=settings.SYNC_CURSOR_LAG_SECONDS), issued_at=now)
+
+    # Always the shard's primary: a row a lagging replica hadn't received yet could end up behind the cursor
+    alias = get_user_shard(user.pk)
+    entries = _after(FoodLogEntry.objects.using(alias).filter(user=user), 'updated_at', cursor.updated_at, cursor.entry_id)
+    entries = list(entries.prefetch_related('food_item').order_by('updated_at', 'pk')[:page_size])
+    tombstones = DeletedFoodLogEntry.objects.using(alias).filter(user_id=user.pk)
+    tombstones = _after(tombstones, 'deleted_at', cursor.deleted_at, cursor.tombstone_id)
+    tombstones = list(tombstones.order_by('deleted_at', 'pk').values_list('deleted_at', 'pk', 'entry_id')[:page_size])
+    has_more = len(entries) == page_size or len(tombstones) == page_size
+
+    for entry in entries:
+        # Saves a user query per entry when serializing
+        entry.user = user
+    updated_at, entry_id = (entries[-1].updated_at, entries[-1].pk) if entries else (cursor.updated_at, cursor.entry_id)
+    deleted_at, tombstone_id = tombstones[-1][:2] if tombstones else (cursor.deleted_at, cursor.tombstone_id)
+    if not has_more:
+        updated_at, entry_id = _lagged(updated_at, entry_id, now)
+        deleted_at, tombstone_id = _lagged(deleted_at, tombstone_id, now)
+
+    return {
+        'changes': entries,
+        'deleted': [entry_id for _, _, entry_id in tombstones],
+        'cursor': Cursor(updated_at, entry_id, deleted_at, tombstone_id, cursor.issued_at if has_more else now),
+        'has_more': has_more,
+        'reset': reset,
+    }
+
+
+def prune_tombstones(alias, batch_size=1000):
+    """
+    Deletes one batch of tombstones older than SYNC_TOMBSTONE_DAYS from a shard. Returns how many.
+    """
+    cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    tombstones = DeletedFoodLogEntry.objects.using(alias)
+    pks = list(tombstones.filter(deleted_at__lt=cutoff).order_by().values_list('pk', flat=True)[:batch_size])
+    if not pks:
+        return 0
+    deleted, _ = tombstones.filter(pk__in=pks).delete()
+    return deleted
@@ -1,3 +1,207 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock, skipIf
+from django.conf import settings
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from users.models import User
+from .models import DeletedFoodLogEntry, FoodItem, FoodLogEntry, UserShard
+from .sharding import SHARD_ID_SPACING, get_user_shard, move_user_entries, set_user_shard
+from .sync import Cursor, _create_entry, apply_client_changes, changes_since
 
-# Create your tests here.
+
+def create_entry(user, **fields):
+    # Saved through the router, on the user's shard
+    entry = FoodLogEntry(
+        user=user, food_name=fields.pop('food_name', 'Apple'), quantity=Decimal(100), quantity_unit='g',
+        calories_consumed=0, protein_consumed=0, carbs_consumed=0, fat_consumed=0, **fields,
+    )
+    entry.save()
+    return entry
+
+
+class SyncTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('sync@example.com', 'Sup3rStrong!pw', name='Sync')
+        self.shard = get_user_shard(self.user.pk, for_write=True)
+        self.long_ago = timezone.now() - timedelta(hours=1)
+        # Assigned to the shard before any cursor of these tests, which would be reset otherwise
+        UserShard.objects.filter(user_id=self.user.pk).update(updated_at=self.long_ago - timedelta(days=1))
+
+    def sync_all(self, cursor=None, page_size=None, now=None):
+        """
+        Pages until has_more is off, returns (changed ids, deleted ids, last cursor).
+        """
+        changed, deleted = [], []
+        while True:
+            with mock.patch('foodtracker.sync.timezone.now', return_value=now or timezone.now()):
+                page = changes_since(self.user, cursor, page_size)
+            changed += [entry.pk for entry in page['changes']]
+            deleted += page['deleted']
+            # Clients only ever see the encoded cursor
+            cursor = Cursor.decode(page['cursor'].encode())
+            if not page['has_more']:
+                return changed, deleted, cursor
+
+    def test_pages_through_entries_with_equal_timestamps(self):
+        entries = [create_entry(self.user) for _ in range(7)]
+        FoodLogEntry.objects.using(self.shard).update(updated_at=self.long_ago)
+
+        changed, deleted, cursor = self.sync_all(page_size=3)
+        self.assertEqual(changed, [entry.pk for entry in entries])
+        self.assertEqual(deleted, [])
+        self.assertEqual(self.sync_all(cursor)[:2], ([], []))
+
+    def test_recent_changes_are_sent_again(self):
+        entry = create_entry(self.user)
+        cursor = self.sync_all()[2]
+        # Still within SYNC_CURSOR_LAG_SECONDS: a concurrent write could commit with an older stamp
+        self.assertEqual(self.sync_all(cursor)[0], [entry.pk])
+
+    def test_changes_and_deletions_since_the_cursor(self):
+        kept, edited, removed = create_entry(self.user), create_entry(self.user), create_entry(self.user)
+        FoodLogEntry.objects.using(self.shard).update(updated_at=self.long_ago)
+        cursor = self.sync_all(now=self.long_ago + timedelta(minutes=10))[2]
+
+        edited.quantity = Decimal(50)
+        edited.save()
+        removed_id = removed.pk
+        removed.delete()
+        FoodLogEntry.objects.using(self.shard).filter(pk=edited.pk).update(updated_at=timezone.now() - timedelta(minutes=1))
+        DeletedFoodLogEntry.objects.using(self.shard).update(deleted_at=timezone.now() - timedelta(minutes=1))
+
+        changed, deleted, cursor = self.sync_all(cursor)
+        self.assertEqual((changed, deleted), ([edited.pk], [removed_id]))
+        self.assertEqual(self.sync_all(cursor)[:2], ([], []))
+        self.assertTrue(FoodLogEntry.objects.using(self.shard).filter(pk=kept.pk).exists())
+
+    def test_pages_through_deletions(self):
+        entries = [create_entry(self.user) for _ in range(5)]
+        entry_ids = [entry.pk for entry in entries]
+        cursor = self.sync_all(now=self.long_ago)[2]
+        for entry in entries:
+            entry.delete()
+        DeletedFoodLogEntry.objects.using(self.shard).update(deleted_at=timezone.now() - timedelta(minutes=1))
+
+        changed, deleted, _ = self.sync_all(cursor, page_size=2)
+        self.assertEqual(changed, [])
+        self.assertEqual(deleted, entry_ids)
+
+    def test_old_cursor_resets(self):
+        create_entry(self.user)
+        cursor = Cursor(timezone.now(), 0, timezone.now(), 0, issued_at=timezone.now() - timedelta(days=365))
+        page = changes_since(self.user, cursor)
+        self.assertTrue(page['reset'])
+        self.assertEqual(len(page['changes']), 1)
+
+    def test_invalid_cursor(self):
+        for value in ('', 'not-a-cursor', Cursor(issued_at=timezone.now()).encode()[:-4]):
+            with self.assertRaises(ValueError):
+                Cursor.decode(value)
+
+    def test_pushing_a_new_entry_twice_logs_it_once(self):
+        food = FoodItem.objects.create(name='Banana', calories=Decimal(89))
+        change = {'client_id': 'c1', 'food_item': food, 'quantity': Decimal(200), 'quantity_unit': 'g'}
+
+        created, rejected = apply_client_changes(self.user, [change], [])
+        # The client never got the response and pushes again
+        self.assertEqual(apply_client_changes(self.user, [change], []), (created, []))
+        self.assertEqual(rejected, [])
+        entry = FoodLogEntry.objects.using(self.shard).get(user=self.user)
+        self.assertEqual(created, [{'client_id': 'c1', 'id': entry.pk}])
+        self.assertEqual((entry.food_name, entry.calories_consumed), ('Banana', Decimal('178.00')))
+
+    def test_overlapping_push_returns_the_first_entry(self):
+        first = create_entry(self.user, client_id='c1')
+        entries = FoodLogEntry.objects.using(self.shard).filter(user_id=self.user.pk)
+        # The other push committed after this one read the known client ids
+        change = {'client_id': 'c1', 'food_name': 'Pear', 'quantity': Decimal(1), 'quantity_unit': 'g'}
+        self.assertEqual(_create_entry(self.user, entries, change), first.pk)
+        self.assertEqual(entries.count(), 1)
+
+    def test_changes_made_since_the_base_version_conflict(self):
+        entry = create_entry(self.user)
+        seen = entry.updated_at
+        entry.quantity = Decimal(150)
+        entry.save()
+
+        change = {'id': entry.pk, 'quantity': Decimal(10), 'base_updated_at': seen}
+        self.assertEqual(apply_client_changes(self.user, [change], []), ([], [{'id': entry.pk, 'reason': 'conflict'}]))
+        entry.refresh_from_db()
+        self.assertEqual(entry.quantity, Decimal(150))
+
+        change['base_updated_at'] = entry.updated_at
+        self.assertEqual(apply_client_changes(self.user, [change], []), ([], []))
+        entry.refresh_from_db()
+        self.assertEqual(entry.quantity, Decimal(10))
+
+    def test_other_users_entries_are_not_found(self):
+        other = User.objects.create_user('other@example.com', 'Sup3rStrong!pw', name='Other')
+        entry = create_entry(other)
+
+        change = {'id': entry.pk, 'quantity': Decimal(1)}
+        self.assertEqual(apply_client_changes(self.user, [change], [entry.pk]), ([], [{'id': entry.pk, 'reason': 'not_found'}]))
+        other_entries = FoodLogEntry.objects.using(get_user_shard(other.pk))
+        self.assertTrue(other_entries.filter(pk=entry.pk, quantity=Decimal(100)).exists())
+
+    def test_pushed_deletion_leaves_a_tombstone(self):
+        entry = create_entry(self.user)
+        apply_client_changes(self.user, [], [entry.pk])
+        self.assertFalse(FoodLogEntry.objects.using(self.shard).filter(pk=entry.pk).exists())
+        self.assertEqual(list(DeletedFoodLogEntry.objects.using(self.shard).values_list('user_id', 'entry_id')), [(self.user.pk, entry.pk)])
+
+
+@skipIf(len(settings.FOOD_LOG_SHARDS) < 2, "needs a second shard, e.g. FOOD_LOG_SHARDS=test_food_logs_1.sqlite3")
+class MoveUserEntriesTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('move@example.com', 'Sup3rStrong!pw', name='Move')
+        self.source, self.target = settings.FOOD_LOG_SHARDS[:2]
+        set_user_shard(self.user.pk, self.source)
+
+    def entries(self, alias):
+        return FoodLogEntry.objects.using(alias).filter(user_id=self.user.pk)
+
+    def test_catches_up_with_writes_during_the_copy(self):
+        kept, edited, removed = (create_entry(self.user, food_name=name) for name in ('Kept', 'Edited', 'Removed'))
+        DeletedFoodLogEntry.objects.using(self.source).create(user_id=self.user.pk, entry_id=0)
+        added = []
+
+        def write_then_switch(user_id, alias):
+            # The user keeps logging on the source shard while the entries are copied
+            edited.quantity = Decimal(5)
+            edited.save()
+            removed.delete()
+            added.append(create_entry(self.user, food_name='Added'))
+            set_user_shard(user_id, alias)
+
+        with mock.patch('foodtracker.sharding.set_user_shard', side_effect=write_then_switch):
+            self.assertEqual(move_user_entries(self.user.pk, self.target, batch_size=2), 3)
+
+        self.assertEqual(get_user_shard(self.user.pk), self.target)
+        self.assertFalse(self.entries(self.source).exists())
+        self.assertFalse(DeletedFoodLogEntry.objects.using(self.source).filter(user_id=self.user.pk).exists())
+        moved = {entry.food_name: entry for entry in self.entries(self.target)}
+        self.assertEqual(set(moved), {'Kept', 'Edited', 'Added'})
+        self.assertEqual(moved['Edited'].quantity, Decimal(5))
+        self.assertEqual((moved['Kept'].created_at, moved['Kept'].updated_at), (kept.created_at, kept.updated_at))
+
+    def test_entries_keep_their_ids_on_a_higher_shard(self):
+        ids = {create_entry(self.user).pk for _ in range(3)}
+        move_user_entries(self.user.pk, self.target)
+        self.assertEqual(set(self.entries(self.target).values_list('pk', flat=True)), ids)
+        # The target still hands out ids from its own range
+        self.assertGreaterEqual(create_entry(self.user).pk, SHARD_ID_SPACING)
+
+    def test_deleted_food_items_are_unlinked_on_every_shard(self):
+        food = FoodItem.objects.create(name='Kale')
+        set_user_shard(self.user.pk, self.target)
+        entry = create_entry(self.user, food_item=food)
+        food.delete()
+        self.assertIsNone(self.entries(self.target).get(pk=entry.pk).food_item_id)
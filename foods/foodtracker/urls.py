@@ -1,14 +1,30 @@
 from django.urls import path
 from .api_views import (
     FoodSearchApiView,
+    FoodFilterView,
     FoodLogEntryListCreateView,
     FoodLogEntryRetrieveUpdateDestroyView,
-    DailySummaryView
+    CopyFoodLogEntriesView,
+    DailySummaryView,
+    QuickAddView,
+    SyncView,
+    BarcodeLookupView,
+    BarcodeBatchLookupView,
+    RecipeListCreateView,
+    RecipeRetrieveUpdateDestroyView,
 )
 
 urlpatterns = [
     path('search/', FoodSearchApiView.as_view(), name='food-search'),
+    path('foods/', FoodFilterView.as_view(), name='food-filter'),
     path('logs/', FoodLogEntryListCreateView.as_view(), name='foodlog-list-create'),
+    path('logs/copy/', CopyFoodLogEntriesView.as_view(), name='foodlog-copy'),
     path('logs/<int:pk>/', FoodLogEntryRetrieveUpdateDestroyView.as_view(), name='foodlog-retrieve-update-destroy'),
+    path('sync/', SyncView.as_view(), name='foodlog-sync'),
     path('summary/', DailySummaryView.as_view(), name='daily-summary'),
+    path('quick-add/', QuickAddView.as_view(), name='quick-add'),
+    path('recipes/', RecipeListCreateView.as_view(), name='recipe-list-create'),
+    path('recipes/<int:pk>/', RecipeRetrieveUpdateDestroyView.as_view(), name='recipe-retrieve-update-destroy'),
+    path('barcode/', BarcodeBatchLookupView.as_view(), name='barcode-lookup-batch'),
+    path('barcode/<str:code>/', BarcodeLookupView.as_view(), name='barcode-lookup'),
 ]
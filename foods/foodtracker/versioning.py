@@ -0,0 +1,66 @@
+import time
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+
+# Bump when the JSON shape of logs/summaries changes, so clients don't keep a 304'd old payload
+REPRESENTATION_VERSION = 1
+
+
+def _version_key(user_id, log_date=None):
+    return f"food_log_version_{user_id}_{log_date or 'all'}"
+
+
+def get_log_version(user_id, log_date=None):
+    """
+    Returns the change version of a user's logs for one date (or all dates when log_date is None).
+    The version is the time.time_ns() of the last change. It isn't sent as Last-Modified: cut to whole
+    seconds, it would let If-Modified-Since miss a second change within the same second.
+    Versions expire after LOG_VERSION_CACHE_TIMEOUT, which bounds how long a worker with its own
+    cache keeps answering with a version another worker has bumped.
+    """
+    key = _version_key(user_id, log_date)
+    version = cache.get(key)
+    if version is None:
+        # Unknown (cold or evicted cache): start a fresh version, clients simply revalidate once
+        version = time.time_ns()
+        if not cache.add(key, version, settings.LOG_VERSION_CACHE_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_log_versions(user_id, log_dates):
+    """
+    Marks the given dates (and the user's whole history) as changed.
+    """
+    version = time.time_ns()
+    keys = {_version_key(user_id, log_date) for log_date in log_dates}
+    keys.add(_version_key(user_id))
+    cache.set_many({key: version for key in keys}, settings.LOG_VERSION_CACHE_TIMEOUT)
+
+
+def get_etag(user_id, log_date=None):
+    """
+    Returns the ETag of a user's logs on a date, without touching the database.
+    """
+    version = get_log_version(user_id, log_date)
+    return f'"{REPRESENTATION_VERSION}-{user_id}-{log_date or "all"}-{version}"'
+
+
+def not_modified(request, etag):
+    """
+    Returns a 304 response if the client's If-None-Match still matches, else None.
+    """
+    response = get_conditional_response(request._request, etag=etag)
+    if response is not None:
+        set_validators(response, etag)
+    return response
+
+
+def set_validators(response, etag):
+    # Pre-compressed bodies are a different representation, so their ETag must be weak
+    response['ETag'] = f"W/{etag}" if response.has_header('Content-Encoding') else etag
+    # Per-user data: only the client may cache it, and it must revalidate every time
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization',))
+    return response
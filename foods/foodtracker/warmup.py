@@ -0,0 +1,154 @@
+"""
+Preloads the caches a fresh worker would otherwise fill on its first requests: the most popular food
+searches (each one an Open Food Facts call) and today's summary of recently active users (an aggregate
+per user). Used by `manage.py warm_caches` and, with CACHE_WARMUP_ON_STARTUP, by every worker at boot.
+Every worker also starts building its in-memory fuzzy search index at boot.
+"""
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db import connections
+from django.utils import timezone
+from .fuzzy import start_fuzzy_index_build
+from .models import FoodLogEntry
+from .open_food_facts import search_food_on_open_food_facts
+from .search import popular_queries, search_cache_key
+from .summaries import cache_daily_summary, summary_cache_key
+from .versioning import get_etag
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_search(query):
+    key = search_cache_key(query)
+    if cache.get(key) is not None:
+        return False
+    results = search_food_on_open_food_facts(query)
+    if not results:
+        # Possibly a failed request, leave it to the next real search
+        return False
+    cache.set(key, results, settings.SEARCH_CACHE_TIMEOUT)
+    return True
+
+
+def _warm_summary(user):
+    log_date = timezone.now().date()
+    etag = get_etag(user.pk, log_date)
+    if cache.get(summary_cache_key(etag)) is not None:
+        return False
+    cache_daily_summary(user, log_date, etag)
+    return True
+
+
+def recently_active_users(hours, limit):
+    """
+    Users who logged food in the last `hours` hours, across all shards.
+    """
+    since = timezone.now() - timedelta(hours=hours)
+    user_ids = set()
+    for alias in settings.FOOD_LOG_SHARDS:
+        user_ids.update(
+            FoodLogEntry.objects.using(alias).filter(created_at__gte=since)
+            .order_by().values_list('user_id', flat=True).distinct()[:limit]
+        )
+    return list(get_user_model().objects.filter(pk__in=list(user_ids)[:limit], is_active=True))
+
+
+def warm_caches(searches=None, users=None, workers=None, seconds=None):
+    """
+    Warms up to `searches` popular queries and the summaries of up to `users` active users, `workers`
+    at a time. Stops starting new work after `seconds`. Returns {'searches': n, 'summaries': n, 'skipped': n},
+    skipped being the tasks left when time ran out.
+    """
+    searches = settings.CACHE_WARMUP_SEARCHES if searches is None else searches
+    users = settings.CACHE_WARMUP_USERS if users is None else users
+    workers = workers or settings.CACHE_WARMUP_WORKERS
+    seconds = settings.CACHE_WARMUP_SECONDS if seconds is None else seconds
+    deadline = time.monotonic() + seconds
+
+    tasks = [('searches', _warm_search, query) for query in popular_queries(searches, settings.CACHE_WARMUP_SEARCH_DAYS)]
+    tasks += [('summaries', _warm_summary, user) for user in recently_active_users(settings.CACHE_WARMUP_ACTIVE_HOURS, users)]
+    counts = {'searches': 0, 'summaries': 0, 'skipped': 0}
+
+    def run(task):
+        kind, warm, arg = task
+        if time.monotonic() > deadline:
+            return 'skipped'
+        try:
+            return kind if warm(arg) else None
+        except Exception:
+            logger.exception("Cache warm-up failed for %s %r", kind, arg)
+            return None
+        finally:
+            # Each pool thread has its own database connections
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(run, tasks):
+            if result is not None:
+                counts[result] += 1
+    return counts
+
+
+# Set by foods/wsgi.py and foods/asgi.py before the apps load, so only web server processes warm up
+WEB_SERVER_ENV = 'FOODS_WEB_SERVER'
+
+_started = False
+_started_lock = threading.Lock()
+
+
+def _is_serving():
+    """
+    True only for web servers: processes started through foods/wsgi.py or foods/asgi.py (or with
+    FOODS_WEB_SERVER=true set by another entrypoint) and runserver's (reloaded) child process.
+    False for tests, migrate, shell, other management commands and workers like celery.
+    """
+    if os.environ.get(WEB_SERVER_ENV) == 'true':
+        return True
+    return (
+        os.path.basename(sys.argv[0]) == 'manage.py' and sys.argv[1:2] == ['runserver']
+        and os.environ.get('RUN_MAIN') == 'true'
+    )
+
+
+def _warm_up(**kwargs):
+    global _started
+    with _started_lock:
+        if _started:
+            return
+        _started = True
+    request_started.disconnect(_warm_up, dispatch_uid='foodtracker-warmup')
+
+    start_fuzzy_index_build()
+    if not settings.CACHE_WARMUP_ON_STARTUP:
+        return
+
+    def warm():
+        try:
+            counts = warm_caches()
+            logger.info("Warmed caches: %s", counts)
+        except Exception:
+            logger.exception("Cache warm-up failed")
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=warm, name='cache-warmup', daemon=True).start()
+
+
+def warm_caches_on_startup():
+    """
+    In web server processes: starts building the worker's fuzzy search index and, with
+    CACHE_WARMUP_ON_STARTUP, warms its caches, both in background threads so requests aren't held up.
+    Started by the worker's first request rather than at import: with gunicorn --preload the apps load
+    in the master process, whose threads don't survive the fork into the workers.
+    """
+    if _is_serving():
+        request_started.connect(_warm_up, dispatch_uid='foodtracker-warmup')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from . models import User
+from . models import User, EmailOutbox, AccountDeletion
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 # Register your models here.
 
@@ -8,7 +8,8 @@ class UserAdmin(BaseUserAdmin):
     model = User
     list_display = ('email', 'name', 'is_staff', 'is_superuser')
     ordering = ('name', 'email',)
-    search_field = ('name', 'email',)
+    # Also what the food log admin's user autocomplete searches
+    search_fields = ('name', 'email',)
     
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
@@ -22,4 +23,20 @@ class UserAdmin(BaseUserAdmin):
             'classes': ('wide',),
             'fields': ('email', 'name', 'password1', 'password2'),
         }),
-    )
\ No newline at end of file
+    )
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to_email', 'status', 'attempts', 'next_attempt_at', 'sent_at', 'created_at')
+    list_filter = ('status',)
+    search_fields = ('to_email',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
+
+@admin.register(AccountDeletion)
+class AccountDeletionAdmin(admin.ModelAdmin):
+    list_display = ('user_id', 'status', 'rows_deleted', 'requested_at', 'updated_at', 'completed_at')
+    list_filter = ('status',)
+    search_fields = ('user_id',)
+    readonly_fields = ('user_id', 'status', 'rows_deleted', 'requested_at', 'updated_at', 'completed_at')
@@ -1,18 +1,20 @@
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.throttling import AnonRateThrottle
+from foods.throttling import AnonSlidingWindowThrottle
 from .models import User
 from rest_framework.generics import RetrieveUpdateDestroyAPIView
 from django.utils.decorators import method_decorator
 from drf_yasg.utils import swagger_auto_schema
 from django.conf import settings
-from django.core.mail import send_mail
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import default_token_generator
 from django.contrib.sites.shortcuts import get_current_site
-from django.template.loader import render_to_string
 from django.utils import timezone
 from datetime import timedelta
+from .authentication import bump_auth_version
+from .deletion import request_account_deletion
+from .emails import queue_email
+from .tokens import revoke_user_tokens
 from .serializer import (
     UserSerializer, RegisterSerializer, ChangePasswordSerializer,
     PasswordResetConfirmSerializer, PasswordResetRequestSerializer,
@@ -21,7 +23,7 @@ from .serializer import (
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.utils.translation import gettext_lazy as _
 
@@ -32,6 +34,14 @@ class UserProfileView(RetrieveUpdateDestroyAPIView):
     def get_object(self):
         return self.request.user
 
+    def destroy(self, request, *args, **kwargs):
+        # Deleting a long history takes a while: deactivate now, purge_deleted_accounts removes the data
+        deletion = request_account_deletion(self.get_object())
+        return Response({
+            "message": _("Your account has been deactivated and its data will be deleted shortly."),
+            "status": deletion.status,
+        }, status=status.HTTP_202_ACCEPTED)
+
 @method_decorator(name='post', decorator=swagger_auto_schema(
     tags=['Register'],
     operation_summary="Register new user",
@@ -40,7 +50,7 @@ class UserProfileView(RetrieveUpdateDestroyAPIView):
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonSlidingWindowThrottle]
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -56,22 +66,12 @@ class RegisterView(generics.CreateAPIView):
         
         verification_link = f"{'https' if request.is_secure() else 'http'}://{current_site.domain}/api/users/verify-email/{uid}/{token}/"
 
-        # Send HTML email
-        subject = _("Verify your email")
-        message = render_to_string('email/verify_email.html', {
+        # Queue HTML email, the send_queued_emails worker delivers it
+        queue_email(_("Verify your email"), 'email/verify_email.html', {
             'user': user,
             'verification_link': verification_link,
             'expiry_hours': settings.EMAIL_VERIFICATION_TIMEOUT_HOURS
-        })
-        
-        send_mail(
-            subject=subject,
-            message="",  # Empty message as we're using html_message
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=message,
-            fail_silently=False,
-        )
+        }, user.email)
 
         return Response({
             "message": _("User registered successfully. Please check your email to verify your account."),
@@ -86,7 +86,7 @@ class RegisterView(generics.CreateAPIView):
 class PasswordResetRequestView(generics.GenericAPIView):
     serializer_class = PasswordResetRequestSerializer
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonSlidingWindowThrottle]
     
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -99,22 +99,12 @@ class PasswordResetRequestView(generics.GenericAPIView):
         current_site = get_current_site(request)
         reset_url = f"{'https' if request.is_secure() else 'http'}://{current_site.domain}/api/users/password-reset-confirm/{uid}/{token}/"
 
-        # Send HTML email
-        subject = _("Password Reset Request")
-        message = render_to_string('email/password_reset_email.html', {
+        # Queue HTML email, the send_queued_emails worker delivers it
+        queue_email(_("Password Reset Request"), 'email/password_reset_email.html', {
             'user': user,
             'reset_link': reset_url,
             'expiry_hours': settings.PASSWORD_RESET_TIMEOUT_HOURS
-        })
-        
-        send_mail(
-            subject=subject,
-            message="",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=message,
-            fail_silently=False,
-        )
+        }, user.email)
         
         return Response(
             {"message": _("Password reset email sent. Please check your inbox.")}, 
@@ -201,7 +191,7 @@ class EmailVerView(APIView):
 ))
 class ResendVerificationEmailView(generics.GenericAPIView):
     permission_classes = [permissions.AllowAny]
-    throttle_classes = [AnonRateThrottle]
+    throttle_classes = [AnonSlidingWindowThrottle]
     serializer_class = ResendVerificationEmailSerializer
     
     def post(self, request, *args, **kwargs):
@@ -232,21 +222,11 @@ class ResendVerificationEmailView(generics.GenericAPIView):
 
         verification_link = f"{'https' if request.is_secure() else 'http'}://{current_site.domain}/users/verify-email/{uid}/{token}/"
 
-        subject = _("Verify your email")
-        message = render_to_string('email/verify_email.html', {
+        queue_email(_("Verify your email"), 'email/verify_email.html', {
             'user': user,
             'verification_link': verification_link,
             'expiry_hours': settings.EMAIL_VERIFICATION_TIMEOUT_HOURS
-        })
-
-        send_mail(
-            subject=subject,
-            message="",
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            html_message=message,
-            fail_silently=False,
-        )
+        }, user.email)
 
         return Response(
             {"message": _("Verification email resent. Please check your inbox.")},
@@ -277,9 +257,7 @@ class ChangePasswordView(generics.UpdateAPIView):
         user.save()
         
         # Logout all sessions
-        tokens = OutstandingToken.objects.filter(user=user)
-        for token in tokens:
-            BlacklistedToken.objects.get_or_create(token=token)
+        revoke_user_tokens(user)
         
         return Response(
             {"message": _("Password updated successfully. Please login again.")}, 
@@ -308,6 +286,7 @@ class LogoutView(generics.GenericAPIView):
             refresh_token = serializer.validated_data['refresh']
             token = RefreshToken(refresh_token)
             token.blacklist()
+            bump_auth_version(request.user.pk)
             
             # Also blacklist the access token if available
             if 'access' in request.data:
@@ -0,0 +1,58 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from foods.routers import primary_pin_key, set_reads_on_primary
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+def auth_version_key(user_id):
+    return f"auth_version_{user_id}"
+
+
+def bump_auth_version(user_id):
+    """
+    Invalidates every cached user resolution for this user.
+    Call it whenever the account changes in a way authentication must notice
+    (password change, logout, profile update, deactivation).
+    """
+    key = auth_version_key(user_id)
+    # add() is a no-op when the key exists, so incr() always has something to increment
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The key was evicted between add() and incr()
+        cache.set(key, 1, None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that caches the resolved user for AUTH_USER_CACHE_TIMEOUT seconds,
+    keyed by user id plus the per-user auth version, so most requests skip the user query.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # One cache round trip for both the auth version and the read-your-writes pin
+        values = cache.get_many([auth_version_key(user_id), primary_pin_key(user_id)])
+        if settings.DATABASE_REPLICAS and values.get(primary_pin_key(user_id)):
+            # This user wrote moments ago, read from the primary (including the user lookup below)
+            set_reads_on_primary()
+        version = values.get(auth_version_key(user_id), 0)
+        user_key = f"auth_user_{user_id}_{version}"
+        user = cache.get(user_key)
+
+        if user is None:
+            # Runs the regular lookup, including the inactive-user and revoked-token checks
+            user = super().get_user(validated_token)
+            cache.set(user_key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return user
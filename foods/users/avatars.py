@@ -0,0 +1,67 @@
+import hashlib
+from io import BytesIO
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+from .authentication import bump_auth_version
+from .models import User
+
+EXTENSIONS = {'JPEG': 'jpg', 'WEBP': 'webp', 'PNG': 'png'}
+
+
+def _render_variant(image, size, image_format):
+    variant = ImageOps.fit(image, (size, size), Image.LANCZOS)
+    buffer = BytesIO()
+    variant.save(buffer, format=image_format, quality=settings.AVATAR_QUALITY, optimize=True)
+    return buffer.getvalue()
+
+
+def build_avatar_variants(avatar_file):
+    """
+    Decodes the uploaded avatar once and writes every AVATAR_VARIANTS size/format.
+    Files are named after a hash of their content, so a URL never changes meaning and
+    clients/CDNs can cache it forever. Returns {variant name: storage path}.
+    """
+    with Image.open(avatar_file) as image:
+        largest = max(size for size, _ in settings.AVATAR_VARIANTS.values())
+        # Lets the JPEG decoder downscale while decoding instead of materializing full resolution
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image).convert('RGB')
+
+        variants = {}
+        for name, (size, image_format) in settings.AVATAR_VARIANTS.items():
+            content = _render_variant(image, size, image_format)
+            digest = hashlib.sha256(content).hexdigest()[:20]
+            path = f"avatars/variants/{digest}.{EXTENSIONS[image_format]}"
+            if not default_storage.exists(path):
+                default_storage.save(path, ContentFile(content))
+            variants[name] = path
+    return variants
+
+
+def process_pending_avatars(batch_size):
+    """
+    Processes one batch of users whose avatar changed.
+    Returns the number of users handled.
+    """
+    users = list(User.objects.filter(avatar_pending=True).only('id', 'avatar')[:batch_size])
+    for user in users:
+        variants = {}
+        if user.avatar:
+            try:
+                with user.avatar.open('rb') as avatar_file:
+                    variants = build_avatar_variants(avatar_file)
+            except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+                # Unreadable upload, keep the original and serve no variants
+                variants = {}
+
+        # Only clear the flag if no newer avatar was uploaded while we were working
+        updated = User.objects.filter(pk=user.pk, avatar=user.avatar.name).update(
+            avatar_variants=variants,
+            avatar_pending=False,
+        )
+        if updated:
+            # update() skips post_save, so invalidate the cached auth user ourselves
+            bump_auth_version(user.pk)
+    return len(users)
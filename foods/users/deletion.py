@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from foodtracker.models import ArchivedFoodLogDay, DeletedFoodLogEntry, FoodItem, FoodLogEntry
+from foodtracker.sharding import shard_cache_key
+from foodtracker.signals import muted_signals
+from .models import AccountDeletion, User
+from .tokens import revoke_user_tokens
+
+
+def request_account_deletion(user):
+    """
+    Deactivates the account right away and queues its data for the purge_deleted_accounts worker.
+    """
+    with transaction.atomic():
+        user.is_active = False
+        # Also invalidates any password reset / email verification link still around,
+        # so the account can't be reactivated
+        user.set_unusable_password()
+        user.save(update_fields=['is_active', 'password'])
+        revoke_user_tokens(user)
+        deletion, _ = AccountDeletion.objects.get_or_create(user_id=user.pk)
+    return deletion
+
+
+def _deletion_steps(user_id):
+    """
+    Querysets of the user's rows, deleted in this order before the user itself.
+    Large or sharded tables go here, so the final user.delete() has nothing big left to cascade to.
+    """
+    for alias in settings.FOOD_LOG_SHARDS:
+        yield FoodLogEntry.objects.using(alias).filter(user_id=user_id)
+        yield DeletedFoodLogEntry.objects.using(alias).filter(user_id=user_id)
+    yield ArchivedFoodLogDay.objects.filter(user_id=user_id)
+    yield BlacklistedToken.objects.filter(token__user_id=user_id)
+    yield OutstandingToken.objects.filter(user_id=user_id)
+
+
+def purge_batch(deletion, batch_size):
+    """
+    Deletes up to batch_size of the account's rows, or the user itself once nothing else is left.
+    Returns the number of rows deleted.
+    """
+    user_id = deletion.user_id
+    deleted = 0
+    with muted_signals():
+        for queryset in _deletion_steps(user_id):
+            pks = list(queryset.order_by().values_list('pk', flat=True)[:batch_size])
+            if pks:
+                deleted, _ = queryset.filter(pk__in=pks).delete()
+                break
+
+    if not deleted:
+        # on_delete=SET_NULL, done here in batches instead of by the collector
+        pks = list(FoodItem.objects.filter(created_by_id=user_id).order_by().values_list('pk', flat=True)[:batch_size])
+        deleted = FoodItem.objects.filter(pk__in=pks).update(created_by=None)
+
+    if deleted:
+        deletion.status = AccountDeletion.Status.PURGING
+    else:
+        User.objects.filter(pk=user_id).delete()
+        cache.delete(shard_cache_key(user_id))
+        deletion.status = AccountDeletion.Status.DONE
+        deletion.completed_at = timezone.now()
+    deletion.rows_deleted += deleted
+    deletion.save(update_fields=['status', 'rows_deleted', 'completed_at', 'updated_at'])
+    return deleted
+
+
+def purge_deleted_accounts(batch_size):
+    """
+    Runs one purge batch for every account waiting to be purged, so one huge account
+    doesn't hold up the others. Returns (rows deleted, accounts completed).
+    """
+    total_deleted, completed = 0, 0
+    pending = AccountDeletion.objects.exclude(status=AccountDeletion.Status.DONE).values_list('pk', flat=True)
+    for pk in list(pending):
+        with transaction.atomic():
+            # Skip accounts another worker is purging right now
+            deletion = AccountDeletion.objects.select_for_update(skip_locked=True).filter(pk=pk).first()
+            if deletion is None or deletion.status == AccountDeletion.Status.DONE:
+                continue
+            total_deleted += purge_batch(deletion, batch_size)
+            completed += deletion.status == AccountDeletion.Status.DONE
+    return total_deleted, completed
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from .models import EmailOutbox
+
+
+def queue_email(subject, template_name, context, recipient):
+    """
+    Renders an HTML email template and stores it in the outbox.
+    The send_queued_emails worker delivers it, so the request never waits on SMTP.
+    """
+    return EmailOutbox.objects.create(
+        to_email=recipient,
+        subject=str(subject),
+        html_body=render_to_string(template_name, context),
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Claims up to batch_size due emails for this worker.
+    Claimed rows are leased until EMAIL_OUTBOX_LEASE_SECONDS from now, after which another
+    worker may pick them up again (e.g. if this one crashed mid-batch).
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(
+                status__in=[EmailOutbox.Status.PENDING, EmailOutbox.Status.SENDING],
+                next_attempt_at__lte=now,
+            )
+            .order_by('next_attempt_at')[:batch_size]
+        )
+        EmailOutbox.objects.filter(pk__in=[email.pk for email in batch]).update(
+            status=EmailOutbox.Status.SENDING,
+            next_attempt_at=now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS),
+        )
+    return batch
+
+
+def _build_message(email, connection):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body="",  # Empty body as we're sending the HTML alternative
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[email.to_email],
+        connection=connection,
+    )
+    message.attach_alternative(email.html_body, "text/html")
+    return message
+
+
+def _mark_failed(email, error):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = EmailOutbox.Status.FAILED
+    else:
+        # Exponential backoff: 1x, 2x, 4x ... the base delay
+        delay = settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * (2 ** (email.attempts - 1))
+        email.status = EmailOutbox.Status.PENDING
+        email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_batch(batch):
+    """
+    Sends a claimed batch over a single SMTP connection.
+    Returns a (sent, failed) tuple.
+    """
+    if not batch:
+        return 0, 0
+
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # SMTP is unreachable, every message in the batch gets retried later
+        for email in batch:
+            _mark_failed(email, e)
+        return 0, len(batch)
+
+    sent, failed = 0, 0
+    try:
+        for email in batch:
+            try:
+                # One message per call so a single bad recipient does not fail the whole batch
+                connection.send_messages([_build_message(email, connection)])
+            except Exception as e:
+                _mark_failed(email, e)
+                failed += 1
+            else:
+                email.status = EmailOutbox.Status.SENT
+                email.attempts += 1
+                email.sent_at = timezone.now()
+                email.last_error = ""
+                email.save(update_fields=['status', 'attempts', 'sent_at', 'last_error'])
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
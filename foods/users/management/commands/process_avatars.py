@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand
+from users.avatars import process_pending_avatars
+
+
+class Command(BaseCommand):
+    help = "Generates resized, content-hashed avatar variants for newly uploaded avatars."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--loop', action='store_true', help="Keep polling for new avatars instead of exiting when none are left.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep between polls in --loop mode.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+
+        while True:
+            processed = process_pending_avatars(batch_size)
+            total += processed
+            if processed:
+                self.stdout.write(f"Processed {processed} avatars")
+
+            if processed == batch_size:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Processed {total} avatars."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from users.tokens import prune_expired_tokens, token_table_sizes
+
+
+class Command(BaseCommand):
+    help = "Deletes expired outstanding and blacklisted JWT tokens in batches and reports the table sizes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        before = token_table_sizes()
+        self.stdout.write(f"Before: {before['outstanding']} outstanding, {before['blacklisted']} blacklisted tokens")
+
+        deleted = 0
+        for count in prune_expired_tokens(batch_size=options['batch_size']):
+            deleted += count
+            self.stdout.write(f"Deleted {deleted} expired tokens so far...")
+
+        after = token_table_sizes()
+        self.stdout.write(f"After: {after['outstanding']} outstanding, {after['blacklisted']} blacklisted tokens")
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {before['outstanding'] - after['outstanding']} outstanding and "
+            f"{before['blacklisted'] - after['blacklisted']} blacklisted tokens."
+        ))
@@ -0,0 +1,31 @@
+import time
+from django.core.management.base import BaseCommand
+from users.deletion import purge_deleted_accounts
+
+
+class Command(BaseCommand):
+    help = "Purges the data of deleted accounts in small batches, then deletes the users."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--loop', action='store_true', help="Keep polling for deleted accounts instead of exiting when done.")
+        parser.add_argument('--interval', type=float, default=30.0, help="Seconds to sleep between polls in --loop mode.")
+
+    def handle(self, *args, **options):
+        total_deleted, total_completed = 0, 0
+
+        while True:
+            deleted, completed = purge_deleted_accounts(options['batch_size'])
+            total_deleted += deleted
+            total_completed += completed
+            if deleted or completed:
+                self.stdout.write(f"Deleted {deleted} rows, completed {completed} accounts")
+
+            # Rows were deleted, so there is probably more waiting, go again right away
+            if deleted:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Deleted {total_deleted} rows, completed {total_completed} accounts."))
@@ -0,0 +1,34 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from users.emails import claim_batch, send_batch
+
+
+class Command(BaseCommand):
+    help = "Sends emails queued in the outbox, in batches over a reused SMTP connection."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=settings.EMAIL_OUTBOX_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help="Keep polling the outbox instead of exiting when it is empty.")
+        parser.add_argument('--interval', type=float, default=5.0, help="Seconds to sleep between polls in --loop mode.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total_sent, total_failed = 0, 0
+
+        while True:
+            batch = claim_batch(batch_size)
+            sent, failed = send_batch(batch)
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+
+            # A full batch means there is probably more waiting, go again right away
+            if len(batch) == batch_size:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done. Sent {total_sent}, failed {total_failed}."))
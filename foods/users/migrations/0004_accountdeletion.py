@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_avatar_pending_user_avatar_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountDeletion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.PositiveBigIntegerField(unique=True, verbose_name='User ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('purging', 'Purging'), ('done', 'Done')], default='pending', max_length=10, verbose_name='Status')),
+                ('rows_deleted', models.PositiveBigIntegerField(default=0, verbose_name='Rows Deleted')),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Account Deletion',
+                'verbose_name_plural': 'Account Deletions',
+                'ordering': ['requested_at'],
+                'indexes': [models.Index(fields=['status', 'requested_at'], name='users_accou_status_8953ef_idx')],
+            },
+        ),
+    ]
@@ -34,10 +34,73 @@ class User(AbstractUser):
     email = models.EmailField(_("email adress"), unique=True)
     name = models.CharField(max_length=30)
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
+    # Resized copies of the avatar, {variant name: storage path}, filled by `manage.py process_avatars`
+    avatar_variants = models.JSONField(default=dict, blank=True)
+    avatar_pending = models.BooleanField(default=False, db_index=True)
     
     objects = AppUserManager()
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["name"]
     
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+class EmailOutbox(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        SENDING = 'sending', _('Sending')
+        SENT = 'sent', _('Sent')
+        FAILED = 'failed', _('Failed')
+
+    to_email = models.EmailField(_("Recipient"))
+    subject = models.CharField(_("Subject"), max_length=255)
+    html_body = models.TextField(_("HTML Body"))
+    status = models.CharField(_("Status"), max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(_("Attempts"), default=0)
+    last_error = models.TextField(_("Last Error"), blank=True)
+    # For pending rows this is when the next try is due, for sending rows it is when the worker's claim expires
+    next_attempt_at = models.DateTimeField(_("Next Attempt At"), default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Queued Email")
+        verbose_name_plural = _("Queued Emails")
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to_email} ({self.status})"
+
+
+class AccountDeletion(models.Model):
+    """
+    A deleted account whose data is being purged in the background by `manage.py purge_deleted_accounts`.
+    Kept after the user row is gone, as a record of the purge.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        PURGING = 'purging', _('Purging')
+        DONE = 'done', _('Done')
+
+    # Not a foreign key, the user row is deleted at the end of the purge
+    user_id = models.PositiveBigIntegerField(_("User ID"), unique=True)
+    status = models.CharField(_("Status"), max_length=10, choices=Status.choices, default=Status.PENDING)
+    rows_deleted = models.PositiveBigIntegerField(_("Rows Deleted"), default=0)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = _("Account Deletion")
+        verbose_name_plural = _("Account Deletions")
+        ordering = ['requested_at']
+        indexes = [
+            models.Index(fields=['status', 'requested_at']),
+        ]
+
+    def __str__(self):
+        return f"User {self.user_id} ({self.status}, {self.rows_deleted} rows deleted)"
@@ -1,16 +1,35 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
 from django.core.validators import EmailValidator
 from django.utils.translation import gettext_lazy as _
 
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
+    avatar_urls = serializers.SerializerMethodField()
+
     class Meta:
         model = User
-        fields = ['id', 'email', 'name', 'avatar', 'date_joined', 'last_login']
+        fields = ['id', 'email', 'name', 'avatar', 'avatar_urls', 'date_joined', 'last_login']
         read_only_fields = ['email', 'date_joined', 'last_login']
+
+    def get_avatar_urls(self, obj):
+        # Resized variants, empty until the process_avatars worker has handled the upload
+        request = self.context.get('request')
+        urls = {}
+        for name, path in obj.avatar_variants.items():
+            url = default_storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request else url
+        return urls
+
+    def update(self, instance, validated_data):
+        if 'avatar' in validated_data:
+            # Variants of the old image no longer apply, queue the new one for processing
+            instance.avatar_variants = {}
+            instance.avatar_pending = bool(validated_data['avatar'])
+        return super().update(instance, validated_data)
         
 class RegisterSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(
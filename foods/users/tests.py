@@ -1,3 +1,69 @@
+from unittest import mock
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from foods.throttling import AnonSlidingWindowThrottle
 
-# Create your tests here.
+
+class ClockThrottle(AnonSlidingWindowThrottle):
+    rate = '10/min'
+    now = 0
+
+    def timer(self):
+        return self.now
+
+
+class SlidingWindowThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.request = APIRequestFactory().get('/', REMOTE_ADDR='10.0.0.1')
+        self.request.user = AnonymousUser()
+
+    def allow(self, now):
+        # DRF makes a new throttle per request, only the cache counters carry over
+        throttle = ClockThrottle()
+        throttle.now = now
+        return throttle, throttle.allow_request(self.request, None)
+
+    def test_limit_within_one_window(self):
+        for _ in range(10):
+            self.assertTrue(self.allow(120)[1])
+        throttle, allowed = self.allow(130)
+        self.assertFalse(allowed)
+        # The next window starts in 50 s, then the 10 requests still weigh fully
+        self.assertEqual(throttle.wait(), 50)
+
+    def test_previous_window_weighs_by_its_overlap(self):
+        for _ in range(10):
+            self.allow(120)
+        # 18 s into the next window: 10 * 0.7 = 7 from the previous one, room for 3 more
+        self.assertEqual([self.allow(198)[1] for _ in range(4)], [True, True, True, False])
+        # 6 s later the previous window only weighs 6
+        self.assertTrue(self.allow(204)[1])
+        self.assertFalse(self.allow(204)[1])
+
+    def test_older_windows_are_ignored(self):
+        for _ in range(10):
+            self.allow(120)
+        self.assertEqual([self.allow(240)[1] for _ in range(11)], [True] * 10 + [False])
+
+    def test_concurrent_increment_is_counted(self):
+        for _ in range(9):
+            self.allow(120)
+        add = cache.add
+
+        def add_after_other_request(key, *args, **kwargs):
+            # Another worker takes the last slot after this request read the counters
+            added = add(key, *args, **kwargs)
+            cache.incr(key)
+            return added
+
+        with mock.patch.object(cache, 'add', side_effect=add_after_other_request):
+            self.assertFalse(self.allow(120)[1])
+
+    def test_clients_have_their_own_counters(self):
+        for _ in range(10):
+            self.allow(120)
+        self.request.META['REMOTE_ADDR'] = '10.0.0.2'
+        self.assertTrue(self.allow(120)[1])
@@ -0,0 +1,49 @@
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+def revoke_user_tokens(user):
+    """
+    Blacklists every still-valid refresh token of the user.
+    Costs one SELECT plus one bulk INSERT, no matter how many sessions the user has.
+    """
+    token_ids = OutstandingToken.objects.filter(
+        user=user,
+        expires_at__gt=timezone.now(),
+        blacklistedtoken__isnull=True,
+    ).order_by().values_list('id', flat=True)
+
+    # ignore_conflicts covers tokens blacklisted concurrently (e.g. a logout racing this call)
+    return BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id in token_ids],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+
+def token_table_sizes():
+    return {
+        'outstanding': OutstandingToken.objects.count(),
+        'blacklisted': BlacklistedToken.objects.count(),
+    }
+
+
+def prune_expired_tokens(batch_size=1000, now=None):
+    """
+    Deletes expired outstanding tokens (and their blacklist rows) in batches, so no
+    single statement holds a long lock on the tables.
+    Yields the number of outstanding tokens deleted per batch.
+    """
+    now = now or timezone.now()
+    while True:
+        # Token lifetimes are fixed, so expired rows are the oldest ids and the scan stops early
+        batch = list(
+            OutstandingToken.objects.filter(expires_at__lte=now)
+            .order_by('id')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not batch:
+            return
+        BlacklistedToken.objects.filter(token_id__in=batch).delete()
+        OutstandingToken.objects.filter(id__in=batch).delete()
+        yield len(batch)